@@ -0,0 +1,91 @@
+import numpy as np
+
+# Below this fraction of live cells the engine gathers and steps only the live ones
+SPARSE_FRACTION = 0.5
+
+class ActiveCells:
+    """Tracks which cells of a (rows, cols, 2) grid still hold animals.
+
+    Without migration cells are independent and an empty cell stays empty,
+    so the active set is a flat index that only ever shrinks. With migration
+    (``reach`` rows of spread per year, ``None`` when unbounded) the engine
+    steps the band of rows around the live cells instead; cells in it may be
+    recolonised. Cells outside the active set are kept zero in both buffers,
+    so skipping them leaves the results unchanged.
+
+    A cell counts as live while any count is above zero. The deterministic
+    integrators only decay a dying population towards zero, never to it, so
+    there the set rarely shrinks unless ``threshold`` is set: counts below
+    it are then zeroed after every year, which does change the results.
+    """
+
+    def __init__(self, grid, reach=0, periodic=False, threshold=0.0):
+        self.rows, self.cols = grid.shape[:2]
+        self.reach = reach
+        self.threshold = threshold
+        self.full_band = reach is None or periodic
+        self.index = np.flatnonzero(np.any(grid.reshape(-1, 2) > 0, axis=1))
+        self.band = self._band_around(self.index)
+
+    @property
+    def count(self):
+        return int(self.index.size)
+
+    @property
+    def cells(self):
+        return self.rows * self.cols
+
+    @property
+    def sparse(self):
+        """Whether gathering the live cells beats stepping the whole grid."""
+        return self.index.size < SPARSE_FRACTION * self.cells
+
+    def _band_around(self, index):
+        if self.full_band:
+            return 0, self.rows
+        if not index.size:
+            return 0, 0
+        # One row of slack beyond the spread keeps the band's cut edges empty all year
+        margin = self.reach + 1 if self.reach else 0
+        return max(0, int(index[0] // self.cols) - margin), min(self.rows, int(index[-1] // self.cols) + 1 + margin)
+
+    def rows_active(self, row_start, row_stop):
+        """Whether any cell in rows ``[row_start, row_stop)`` must be stepped this year."""
+        if self.reach != 0:
+            return row_start < self.band[1] and row_stop > self.band[0]
+        low, high = np.searchsorted(self.index, [row_start * self.cols, row_stop * self.cols])
+        return high > low
+
+    def update(self, grid, spare):
+        """Refresh the active set from the freshly stepped ``grid``.
+
+        Cells (or band rows) that dropped out are zeroed in ``spare``, the
+        other buffer, so the next year can skip them; they are already zero
+        in ``grid``. Returns the number of cells that went extinct.
+        """
+        flat = grid.reshape(-1, 2)
+        spare_flat = spare.reshape(-1, 2)
+        if self.reach == 0:
+            live = flat[self.index]
+            if self.threshold:
+                live[live < self.threshold] = 0
+                flat[self.index] = live
+            alive = np.any(live > 0, axis=1)
+            dropped = self.index[~alive]
+            spare_flat[dropped] = 0
+            self.index = self.index[alive]
+            return int(dropped.size)
+        low, high = self.band
+        before = self.index.size
+        band_cells = flat[low * self.cols:high * self.cols]
+        if self.threshold:
+            band_cells[band_cells < self.threshold] = 0
+        self.index = np.flatnonzero(np.any(band_cells > 0, axis=1)) + low * self.cols
+        self.band = self._band_around(self.index)
+        new_low, new_high = self.band
+        if new_high <= new_low:
+            spare[low:high] = 0
+        else:
+            spare[low:new_low] = 0
+            spare[new_high:high] = 0
+        return max(0, before - int(self.index.size))
@@ -2,6 +2,7 @@ import os
 import json
 from dotenv import load_dotenv
 from google import genai
+from .history import legacy_results
 
 def generate_ai_summary(results):
   
@@ -20,7 +21,7 @@ def generate_ai_summary(results):
         "Highlight key trends, cyclical behaviors, and any notable findings. "
         "Use clear, professional language suitable for a research summary.\n\n"
         "Simulation Data (JSON):\n"
-        f"{json.dumps(results, indent=2)}"
+        f"{json.dumps(legacy_results(results), indent=2)}"
     )
 
     client = genai.Client(api_key=api_key)
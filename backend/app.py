@@ -1,23 +1,88 @@
-from flask import Flask, send_from_directory
-from flask_socketio import SocketIO
+from flask import Flask, Response, request, send_from_directory
+from flask_socketio import SocketIO, join_room, leave_room
 from flask_cors import CORS
 import os
 import threading
 import json
+import uuid
 import traceback
-from .simulation import run_simulation
+from .simulation import resume_simulation, run_simulation
+from .checkpoint import load_checkpoint
+from .sweep import build_parameter_sets, run_sweep
 from .ai_summary import generate_ai_summary
-from .pdf_report import generate_pdf_report
+from .pdf_report import generate_pdf_report, plot_pool
+from .plotting import DEFAULT_RENDER_PROFILE, render_profile
 from .utils import download_logo
+from .worker_pool import WorkerPool
+from .run_store import RunStore, npy_chunks, prune_oldest
+from .history import public_params
+from .instrumentation import make_timer
+from .jobs import JobManager, JobQueueFull
+from .backends import available_cores
+from .progress import ProgressBatcher
+from .emitter import EmitterPipeline, emit_settings
+from .grid_stream import GridStream
+from .result_cache import ResultCache, cache_key
+from .rooms import RoomMetrics, job_room
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# Every event goes to one room: the requesting session, or the room of the job it belongs to
+rooms = RoomMetrics(socketio)
 
 
 os.makedirs(os.path.join(os.path.dirname(__file__), 'static'), exist_ok=True)
 os.makedirs(os.path.join(os.path.dirname(__file__), 'static', 'plots'), exist_ok=True)
-simulation_results = {}
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), 'static', 'reports')
+worker_pool = WorkerPool.from_env().register_shutdown()
+run_store = RunStore.from_env()
+result_cache = ResultCache.from_env()
+CHECKPOINT_DIR = os.environ.get('SIM_CHECKPOINT_DIR', os.path.join(os.path.dirname(__file__), 'checkpoints'))
+CHECKPOINT_EVERY_SECONDS = float(os.environ.get('SIM_CHECKPOINT_SECONDS', 60))
+RENDER_PROFILE = os.environ.get('SIM_RENDER_PROFILE', DEFAULT_RENDER_PROFILE)
+MAX_JSON_VALUES = 2_000_000
+# Grid frame streams of queued and running jobs, and the sessions subscribed to them, by job id
+grid_streams = {}
+grid_subscribers = {}
+
+def parse_bool(value):
+    """A payload flag as a bool; strings such as ``"false"`` or ``"0"`` are read by their meaning, not truthiness."""
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ('true', '1', 'yes', 'on'):
+            return True
+        if text in ('false', '0', 'no', 'off', ''):
+            return False
+        raise ValueError(f"'{value}' is not a boolean")
+    return bool(value)
+
+def simulation_options(data):
+    """Optional engine, backend, integrator, migration, grid, early-stop, stochastic, agent and checkpoint settings of a start_simulation payload as run_simulation kwargs."""
+    options = {
+        "engine": str(data.get('engine', 'vectorized')),
+        "backend": str(data.get('backend', 'auto')),
+        "integrator": str(data.get('integrator', 'euler')),
+        "boundary": str(data.get('boundary', 'reflecting')),
+        "history_dtype": str(data.get('history_dtype', 'float32'))
+    }
+    for key in ('dt', 'rtol', 'atol', 'rabbit_migration', 'wolf_migration', 'density', 'memory_budget_mb',
+                'cell_tol', 'global_tol', 'agent_speed', 'extinction_threshold'):
+        if data.get(key) is not None:
+            options[key] = float(data[key])
+    if data.get('checkpoint_every_seconds') is not None:
+        options['checkpoint_every_seconds'] = float(data['checkpoint_every_seconds'])
+    for key in ('rows', 'cols', 'patience', 'checkpoint_every_years', 'seed', 'max_agents'):
+        if data.get(key) is not None:
+            options[key] = int(data[key])
+    for key in ('cell_history', 'early_stop', 'stochastic', 'agent_starvation', 'instrument'):
+        if data.get(key) is not None:
+            options[key] = parse_bool(data[key])
+    return options
+
+def reply(event, data):
+    """Send an event to the session whose request is being handled."""
+    rooms.emit(event, data, request.sid)
 
 @socketio.on('start_simulation')
 def handle_start_simulation(data):
@@ -27,7 +92,7 @@ def handle_start_simulation(data):
             data = json.loads(data)
         except json.JSONDecodeError:
             print('[ERROR] Failed to parse JSON data')
-            socketio.emit('error', {"message": "Invalid JSON data"})
+            reply('error', {"message": "Invalid JSON data"})
             return
     try:
         start_year = int(data['start_year'])
@@ -38,58 +103,560 @@ def handle_start_simulation(data):
         beta = float(data['beta'])
         gamma = float(data['gamma'])
         delta = float(data['delta'])
-    except (KeyError, ValueError) as e:
+        options = simulation_options(data)
+    except (KeyError, TypeError, ValueError) as e:
         print(f'[ERROR] Invalid simulation parameters: {str(e)}')
-        socketio.emit('error', {"message": f"Invalid parameters: {str(e)}"})
+        reply('error', {"message": f"Invalid parameters: {str(e)}"})
         return
-    print(f'[INFO] Starting simulation: {start_year}-{end_year}, rabbits={rabbits}, wolves={wolves}, alpha={alpha}, beta={beta}, gamma={gamma}, delta={delta}')
+    run_id = uuid.uuid4().hex
+    options['checkpoint_path'] = os.path.join(CHECKPOINT_DIR, f'{run_id}.npz')
+    options['history_path'] = run_store.history_path(run_id)
+    if 'checkpoint_every_years' not in options:
+        options.setdefault('checkpoint_every_seconds', CHECKPOINT_EVERY_SECONDS)
+    # Concurrent runs split the cores between their thread backends
+    options.setdefault('workers', max(1, available_cores() // job_manager.max_concurrent))
+    try:
+        progress = progress_options(data)
+        stream = grid_stream_for(data)
+        profile = report_profile(data)
+        use_cache = parse_bool(data.get('cache', True))
+    except (TypeError, ValueError) as e:
+        print(f'[ERROR] Invalid progress settings: {str(e)}')
+        reply('error', {"message": f"Invalid parameters: {str(e)}"})
+        return
+    key = cache_key(dict(
+        start_year=start_year, end_year=end_year, rabbits=rabbits, wolves=wolves,
+        alpha=alpha, beta=beta, gamma=gamma, delta=delta, **options
+    ), profile) if use_cache else None
+    cached = result_cache.get(key)
+    if cached is not None:
+        print(f'[INFO] Serving simulation {cached["runId"]} from the result cache')
+        replay_cached(key, cached, progress, rooms.to(request.sid), profile)
+        return
+    print(f'[INFO] Queueing simulation {run_id}: {start_year}-{end_year}, rabbits={rabbits}, wolves={wolves}, alpha={alpha}, beta={beta}, gamma={gamma}, delta={delta}, options={options}')
     threading.Thread(target=download_logo, daemon=True).start()
-    def run_simulation_thread():
+    submit_job(run_id, lambda job: run_and_report(job, lambda emitter: run_simulation(
+        start_year, end_year, rabbits, wolves, alpha, beta, gamma, delta, emitter,
+        pool=worker_pool, cancel_event=job.cancel_event, grid_stream=stream, **options
+    ), data, progress, key, profile), data, kind='simulation', stream=stream)
+
+@socketio.on('resume_simulation')
+def handle_resume_simulation(data):
+    print('[INFO] Received resume_simulation event')
+    if isinstance(data, str):
         try:
-            results = run_simulation(
-                start_year, end_year, rabbits, wolves, alpha, beta, gamma, delta, socketio
-            )
-            simulation_results['results'] = results
-            simulation_results['params'] = data
-            print('[INFO] Generating AI summary')
-            try:
-                summary = generate_ai_summary(results)
-            except Exception as e:
-                print(f'[ERROR] AI summary generation failed: {str(e)}')
-                summary = "AI summary could not be generated. Please check the simulation results manually."
-            print('[INFO] Generating final PDF report')
-            try:
-                pdf_path = generate_pdf_report(
-                    results, 
-                    summary, 
-                    data, 
-                    results.get('execution_time'),
-                    results.get('cores_used'),
-                    results.get('performance_data')
-                )
-                pdf_url = f"http://localhost:5000/static/report.pdf"
-                print(f'[INFO] PDF report ready at {pdf_url}')
-                socketio.emit('pdf_ready', {
-                    "pdfUrl": pdf_url,
-                    "executionTime": results.get('execution_time'),
-                    "cores": results.get('cores_used')
-                })
-            except Exception as e:
-                print(f'[ERROR] PDF generation failed: {str(e)}')
-                traceback.print_exc()
-                socketio.emit('error', {"message": f"PDF generation failed: {str(e)}"})
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            print('[ERROR] Failed to parse JSON data')
+            reply('error', {"message": "Invalid JSON data"})
+            return
+    run_id = str(data.get('run_id', '')) if isinstance(data, dict) else ''
+    checkpoint_path = os.path.join(CHECKPOINT_DIR, f'{run_id}.npz')
+    if not run_id.isalnum() or not os.path.exists(checkpoint_path):
+        print(f'[ERROR] No checkpoint for run {run_id}')
+        reply('error', {"message": f"No checkpoint found for run '{run_id}'"})
+        return
+    if run_id in active_job_ids():
+        reply('error', {"message": f"Run '{run_id}' is already queued or running"})
+        return
+    try:
+        progress = progress_options(data)
+        stream = grid_stream_for(data)
+        profile = report_profile(data)
+    except (TypeError, ValueError) as e:
+        print(f'[ERROR] Invalid progress settings: {str(e)}')
+        reply('error', {"message": f"Invalid parameters: {str(e)}"})
+        return
+    print(f'[INFO] Queueing resume of simulation {run_id}')
+    submit_job(run_id, lambda job: run_and_report(job, lambda emitter: resume_simulation(
+        checkpoint_path, emitter, pool=worker_pool, cancel_event=job.cancel_event, grid_stream=stream
+    ), None, progress, profile=profile), data, kind='resume', stream=stream)
+
+def progress_options(data):
+    """The ``progress_*`` and ``emit_*`` settings of a payload, checked up front."""
+    options = {key: data[key] for key in ('progress_rate', 'progress_batch', 'progress_encoding', 'emit_policy', 'emit_queue')
+               if data.get(key) is not None}
+    ProgressBatcher.from_options(None, options)
+    emit_settings(options)
+    return options
+
+def report_profile(data):
+    """The ``render_profile`` of a payload (default ``SIM_RENDER_PROFILE``), checked up front."""
+    profile = str(data.get('render_profile') or RENDER_PROFILE)
+    render_profile(profile)
+    return profile
+
+def grid_subscription(data):
+    """``subscribe_grid`` options of a payload as ``GridStream.subscribe`` kwargs."""
+    options = {}
+    for key, convert in (('keyframe_every', int), ('threshold', float), ('dtype', str), ('compress', parse_bool), ('every', int)):
+        if data.get(key) is not None:
+            options[key] = convert(data[key])
+    return options
+
+def grid_stream_for(data):
+    """A run's grid stream, already subscribed when the start payload carries ``grid_stream`` options."""
+    stream = GridStream()
+    if isinstance(data.get('grid_stream'), dict):
+        stream.subscribe(**grid_subscription(data['grid_stream']))
+    return stream
+
+class JobEmitter:
+    """Sends a run's events, tagged with its job id, to the job's room (or ``room``) and tracks the job's progress."""
+
+    def __init__(self, job, room=None):
+        self.job = job
+        self.room = room or job_room(job.id)
+
+    def emit(self, event, data=None):
+        if event in ('year_update', 'progress_frame') and data.get('year') is not None:
+            self.job.progress = {"year": data['year']}
+        if isinstance(data, dict):
+            data = dict(data, jobId=self.job.id)
+        rooms.emit(event, data, self.room)
+
+def grid_room(job_id):
+    return f"{job_room(job_id)}:grid"
+
+def emit_job_status(job, to=None):
+    if job.state not in ('queued', 'running'):
+        grid_streams.pop(job.id, None)
+        grid_subscribers.pop(job.id, None)
+    rooms.emit('job_status', job.status(), to or job_room(job.id))
+
+job_manager = JobManager.from_env(on_change=emit_job_status).register_shutdown()
+
+def active_job_ids():
+    return {status['jobId'] for status in job_manager.jobs() if status['state'] in ('queued', 'running')}
+
+def prune_stored_runs(job_id):
+    """Cap stored runs and job reports at ``SIM_MAX_STORED_RUNS``, keeping active and resumable runs."""
+    protect = active_job_ids() | {job_id}
+    if os.path.isdir(CHECKPOINT_DIR):
+        protect |= {name[:-len('.npz')] for name in os.listdir(CHECKPOINT_DIR) if name.endswith('.npz')}
+    try:
+        run_store.prune(protect)
+        prune_oldest(REPORTS_DIR, run_store.max_runs, protect)
+    except OSError as e:
+        print(f'[WARNING] Could not prune stored runs: {str(e)}')
+
+def submit_job(job_id, run, data, kind, stream=None):
+    """Queue ``run(job)`` and tell the client where it stands, or why it was refused."""
+    join_room(job_room(job_id))
+    if stream is not None:
+        grid_streams[job_id] = stream
+        if stream.subscribed:
+            join_grid(job_id)
+    try:
+        priority = int(data.get('priority', 0)) if isinstance(data, dict) else 0
+        job_manager.submit(job_id, run, priority=priority, metadata={"kind": kind})
+    except (JobQueueFull, ValueError) as e:
+        print(f'[ERROR] Could not queue job {job_id}: {str(e)}')
+        reply('error', {"message": str(e)})
+        leave_room(job_room(job_id))
+        leave_grid(job_id)
+        grid_streams.pop(job_id, None)
+        return None
+    rooms.emit('job_queued', {
+        "jobId": job_id, "kind": kind, "priority": priority, "position": job_manager.position(job_id)
+    }, job_room(job_id))
+    return job_id
+
+def join_grid(job_id):
+    """Add the requesting session to a job's grid frame room."""
+    join_room(grid_room(job_id))
+    grid_subscribers.setdefault(job_id, set()).add(request.sid)
+
+def leave_grid(job_id, sid=None):
+    """Remove a session from a job's grid frame room; the stream stops encoding once nobody is left."""
+    sid = sid or request.sid
+    leave_room(grid_room(job_id), sid=sid)
+    subscribers = grid_subscribers.get(job_id, set())
+    subscribers.discard(sid)
+    if not subscribers and job_id in grid_streams:
+        grid_streams[job_id].unsubscribe()
+
+def run_and_report(job, run, params, progress=None, key=None, profile=DEFAULT_RENDER_PROFILE):
+    """Job body: run the simulation, store it, then summarise it and build the job's PDF report.
+
+    The run's events are sent from an emitter thread (``emit_*`` options)
+    and its per-year updates coalesced into ``progress_frame`` events
+    according to the ``progress_*`` options. The report's plots use the
+    render ``profile``. With a cache ``key`` the finished report is added
+    to the result cache.
+    """
+    progress = progress or {}
+    emitter = EmitterPipeline.from_options(ProgressBatcher.from_options(JobEmitter(job), progress), progress)
+    grid_emitter = None
+    if job.id in grid_streams:
+        # Frames are encoded on the pipeline thread, so the compute loop only copies the grid
+        _, policy = emit_settings(progress)
+        grid_emitter = grid_streams[job.id].attach(JobEmitter(job, grid_room(job.id)), policy=policy)
+    emitter.emit('simulation_started', {"runId": job.id, "resumed": params is None})
+    try:
+        results = run(emitter)
+    except Exception as e:
+        print(f'[ERROR] Simulation failed: {str(e)}')
+        print(f'[ERROR] Traceback: {traceback.format_exc()}')
+        emitter.emit('error', {"message": f"Simulation failed: {str(e)}"})
+        raise
+    finally:
+        emitter.close()
+        if grid_emitter is not None:
+            grid_emitter.close()
+        job.metadata['emitter'] = emitter.stats()
+    if job.cancelled:
+        emitter.emit('simulation_cancelled', {"runId": job.id, "year": results['termination']['year']})
+        return results
+    report_params = params or results['params']
+    try:
+        run_store.save(job.id, results)
+    except Exception as e:
+        print(f'[ERROR] Failed to store run {job.id}: {str(e)}')
+    prune_stored_runs(job.id)
+    timer = make_timer(results['params'].get('instrument', True))
+    print('[INFO] Generating AI summary')
+    try:
+        summary = generate_ai_summary(results)
+    except Exception as e:
+        print(f'[ERROR] AI summary generation failed: {str(e)}')
+        summary = "AI summary could not be generated. Please check the simulation results manually."
+    timer.lap('summary')
+    print('[INFO] Generating final PDF report')
+    report_dir = os.path.join(REPORTS_DIR, job.id)
+    plot_timings = {}
+    try:
+        pdf_path = generate_pdf_report(
+            results, 
+            summary, 
+            report_params, 
+            results.get('execution_time'),
+            results.get('cores_used'),
+            results.get('performance_data'),
+            output_dir=report_dir,
+            timer=timer,
+            plot_timings=plot_timings,
+            profile=profile
+        )
+        results['report_phases'] = timer.totals_ms()
+        results['plot_timings'] = plot_timings
+        pdf_url = f"http://localhost:5000/static/reports/{job.id}/report.pdf"
+        job.metadata['pdfUrl'] = pdf_url
+        print(f'[INFO] PDF report ready at {pdf_url}')
+        emitter.emit('pdf_ready', {
+            "pdfUrl": pdf_url,
+            "runId": job.id,
+            "executionTime": results.get('execution_time'),
+            "cores": results.get('cores_used'),
+            "renderProfile": profile,
+            **({"reportPhases": results['report_phases'], "plotTimings": plot_timings} if timer.enabled else {})
+        })
+    except Exception as e:
+        print(f'[ERROR] PDF generation failed: {str(e)}')
+        traceback.print_exc()
+        emitter.emit('error', {"message": f"PDF generation failed: {str(e)}"})
+        return results
+    # A fallback summary would be served again on every later hit, so such reports are not cached
+    if pdf_path and not summary.startswith("AI summary could not be generated"):
+        try:
+            result_cache.put(key, job.id, results, summary, report_dir)
+        except OSError as e:
+            print(f'[WARNING] Could not cache run {job.id}: {str(e)}')
+    return results
+
+def replay_cached(key, entry, progress, target, profile=DEFAULT_RENDER_PROFILE):
+    """Send a cached run's progress frames and report to ``target`` straight away, as if the run had just finished."""
+    results = entry['results']
+    run_id = entry['runId']
+    # Nothing to wait for, so frames are only split by size
+    emitter = ProgressBatcher.from_options(target, dict(progress, progress_rate=0))
+    emitter.emit('simulation_started', {"runId": run_id, "cached": True})
+    for year_idx, (rabbits, wolves) in enumerate(zip(results['total_rabbits_by_year'], results['total_wolves_by_year'])):
+        emitter.emit('year_update', {"year": results['start_year'] + year_idx, "rabbits": rabbits, "wolves": wolves})
+    for performance in results['performance_data']:
+        emitter.emit('performance_update', {
+            "year": performance['year'],
+            "timePerYear": performance['timePerYear'],
+            "memoryUsage": performance['memoryUsage'],
+            "cores": results.get('cores_used')
+        })
+    emitter.close()
+    emitter.emit('pdf_ready', {
+        "pdfUrl": f"http://localhost:5000/api/cache/{key}/report.pdf",
+        "runId": run_id,
+        "executionTime": results.get('execution_time'),
+        "cores": results.get('cores_used'),
+        "renderProfile": profile,
+        "cached": True
+    })
+
+def sweep_request(data):
+    """The validated ``run_sweep`` arguments of a sweep payload: sets, start year, end year and options."""
+    parameter_sets = build_parameter_sets(data.get('base'), data.get('grid'), data.get('sets'))
+    options = {"integrator": str(data.get('integrator', 'euler'))}
+    for key in ('dt', 'rtol', 'atol'):
+        if data.get(key) is not None:
+            options[key] = float(data[key])
+    if data.get('chunk_size') is not None:
+        options['chunk_size'] = int(data['chunk_size'])
+    return parameter_sets, int(data['start_year']), int(data['end_year']), options
+
+def sweep_job(sweep_args, room=None):
+    """Job body running a parsed sweep; with a ``room`` the result or error is also sent there."""
+    parameter_sets, start_year, end_year, options = sweep_args
+    def run(job):
+        try:
+            result = run_sweep(parameter_sets, start_year, end_year, pool=worker_pool,
+                               cancel_event=job.cancel_event, **options)
         except Exception as e:
-            error_msg = str(e)
-            traceback_str = traceback.format_exc()
-            print(f'[ERROR] Simulation failed: {error_msg}')
-            print(f'[ERROR] Traceback: {traceback_str}')
-            socketio.emit('error', {"message": f"Simulation failed: {error_msg}"})
-    threading.Thread(target=run_simulation_thread, daemon=True).start()
+            print(f'[ERROR] Sweep failed: {str(e)}')
+            if room is not None:
+                rooms.emit('error', {"message": f"Sweep failed: {str(e)}", "jobId": job.id}, room)
+            raise
+        if room is not None and result is not None:
+            rooms.emit('sweep_result', dict(result, jobId=job.id), room)
+        return result
+    return run
+
+@socketio.on('start_sweep')
+def handle_start_sweep(data):
+    print('[INFO] Received start_sweep event')
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError:
+            print('[ERROR] Failed to parse JSON data')
+            reply('error', {"message": "Invalid JSON data"})
+            return
+    try:
+        sweep_args = sweep_request(data)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        print(f'[ERROR] Invalid sweep parameters: {str(e)}')
+        reply('error', {"message": f"Invalid sweep parameters: {str(e)}"})
+        return
+    job_id = uuid.uuid4().hex
+    submit_job(job_id, sweep_job(sweep_args, job_room(job_id)), data, kind='sweep')
+
+@app.route('/api/sweep', methods=['POST'])
+def sweep():
+    """Queue a sweep as a job; its result is served by ``/api/jobs/<jobId>/result`` once it completes."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return {"message": "Invalid JSON data"}, 400
+    try:
+        sweep_args = sweep_request(data)
+        priority = int(data.get('priority', 0))
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        print(f'[ERROR] Invalid sweep parameters: {str(e)}')
+        return {"message": f"Invalid sweep parameters: {str(e)}"}, 400
+    job_id = uuid.uuid4().hex
+    try:
+        job_manager.submit(job_id, sweep_job(sweep_args), priority=priority, metadata={"kind": "sweep"})
+    except JobQueueFull as e:
+        return {"message": str(e)}, 503
+    return {"jobId": job_id, "position": job_manager.position(job_id)}, 202
 
 @app.route('/')
 def index():
     return "Predator-Prey Simulation API is running. Connect via Socket.IO."
 
+@socketio.on('cancel_job')
+def handle_cancel_job(data):
+    job_id = str(data.get('job_id', '')) if isinstance(data, dict) else str(data)
+    try:
+        if not job_manager.cancel(job_id):
+            reply('error', {"message": f"Job '{job_id}' has already finished"})
+    except KeyError as e:
+        reply('error', {"message": str(e.args[0])})
+
+@socketio.on('job_status')
+def handle_job_status(data):
+    job_id = str(data.get('job_id', '')) if isinstance(data, dict) else str(data)
+    try:
+        emit_job_status(job_manager.get(job_id), to=request.sid)
+    except KeyError as e:
+        reply('error', {"message": str(e.args[0])})
+
+@socketio.on('subscribe_grid')
+def handle_subscribe_grid(data):
+    if not isinstance(data, dict):
+        reply('error', {"message": "Invalid JSON data"})
+        return
+    job_id = str(data.get('job_id', ''))
+    stream = grid_streams.get(job_id)
+    if stream is None:
+        reply('error', {"message": f"No queued or running simulation '{job_id}'"})
+        return
+    # Settings are shared by the job's subscribers; only a sole subscriber may change them
+    sole = grid_subscribers.get(job_id, set()) <= {request.sid}
+    try:
+        stream.subscribe(**grid_subscription(data), replace=sole)
+    except (TypeError, ValueError) as e:
+        reply('error', {"message": f"Invalid grid stream settings: {str(e)}"})
+        return
+    join_grid(job_id)
+
+@socketio.on('unsubscribe_grid')
+def handle_unsubscribe_grid(data):
+    job_id = str(data.get('job_id', '')) if isinstance(data, dict) else str(data)
+    leave_grid(job_id)
+
+@socketio.on('join_job')
+def handle_join_job(data):
+    """Follow another session's job: its progress, status and report events from now on."""
+    job_id = str(data.get('job_id', '')) if isinstance(data, dict) else str(data)
+    try:
+        job = job_manager.get(job_id)
+    except KeyError as e:
+        reply('error', {"message": str(e.args[0])})
+        return
+    join_room(job_room(job_id))
+    emit_job_status(job, to=request.sid)
+
+@socketio.on('leave_job')
+def handle_leave_job(data):
+    job_id = str(data.get('job_id', '')) if isinstance(data, dict) else str(data)
+    leave_room(job_room(job_id))
+    leave_grid(job_id)
+
+@socketio.on('disconnect')
+def handle_disconnect(*args):
+    for job_id in [job_id for job_id, subscribers in grid_subscribers.items() if request.sid in subscribers]:
+        leave_grid(job_id)
+
+@app.route('/api/jobs')
+def list_jobs():
+    return {"jobs": job_manager.jobs(), "maxConcurrent": job_manager.max_concurrent}
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    try:
+        job = job_manager.get(job_id)
+    except KeyError as e:
+        return {"message": str(e.args[0])}, 404
+    return dict(job.status(), position=job_manager.position(job_id))
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    try:
+        job = job_manager.get(job_id)
+    except KeyError as e:
+        return {"message": str(e.args[0])}, 404
+    if job.metadata.get('kind') != 'sweep':
+        return {"message": f"Job '{job_id}' is not a sweep; simulation results are under /api/runs"}, 404
+    if job.state != 'completed':
+        return {"message": f"Job '{job_id}' is {job.state}", "state": job.state}, 409
+    if job.result is None:
+        return {"message": f"The result of job '{job_id}' is no longer kept"}, 410
+    return job.result
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    try:
+        cancelled = job_manager.cancel(job_id)
+    except KeyError as e:
+        return {"message": str(e.args[0])}, 404
+    if not cancelled:
+        return {"message": f"Job '{job_id}' has already finished"}, 409
+    return job_manager.get(job_id).status()
+
+@app.route('/api/cache')
+def cache_stats():
+    return result_cache.stats()
+
+@app.route('/api/cache/<key>/report.pdf')
+def cached_report(key):
+    try:
+        path = result_cache.report_path(key)
+    except KeyError as e:
+        return {"message": str(e.args[0])}, 404
+    return send_from_directory(os.path.dirname(path), 'report.pdf')
+
+@app.route('/api/checkpoints')
+def list_checkpoints():
+    checkpoints = []
+    if os.path.isdir(CHECKPOINT_DIR):
+        for filename in sorted(os.listdir(CHECKPOINT_DIR)):
+            if not filename.endswith('.npz'):
+                continue
+            try:
+                _, meta = load_checkpoint(os.path.join(CHECKPOINT_DIR, filename))
+            except Exception as e:
+                print(f'[WARNING] Skipping unreadable checkpoint {filename}: {str(e)}')
+                continue
+            checkpoints.append({
+                "runId": filename[:-len('.npz')],
+                "year": meta['params']['start_year'] + meta['year_idx'],
+                "params": public_params(meta['params'])
+            })
+    return {"checkpoints": checkpoints}
+
+@app.route('/api/runs')
+def list_runs():
+    return {"runs": run_store.runs()}
+
+@app.route('/api/runs/<run_id>')
+def run_meta(run_id):
+    try:
+        return run_store.meta(run_id)
+    except KeyError as e:
+        return {"message": str(e.args[0])}, 404
+
+def history_response(run_id, select):
+    """Serve ``select(history)`` as JSON, or as streamed ``.npy`` bytes with ``?format=npy``."""
+    try:
+        history = run_store.history(run_id)
+        selection = select(history)
+    except KeyError as e:
+        return {"message": str(e.args[0])}, 404
+    except IndexError as e:
+        return {"message": str(e)}, 404
+    if request.args.get('format') == 'npy':
+        return Response(npy_chunks(selection), mimetype='application/octet-stream')
+    if selection.size > MAX_JSON_VALUES:
+        return {"message": f"{selection.size} values exceed the JSON limit of {MAX_JSON_VALUES}, use format=npy"}, 413
+    return {
+        "shape": list(selection.shape),
+        "rabbits": selection[..., 0].tolist(),
+        "wolves": selection[..., 1].tolist()
+    }
+
+@app.route('/api/runs/<run_id>/years/<int:year>')
+def run_year(run_id, year):
+    return history_response(run_id, lambda history: history.year(year))
+
+@app.route('/api/runs/<run_id>/years')
+def run_year_range(run_id):
+    def select(history):
+        start = request.args.get('start', history.start_year, type=int)
+        end = request.args.get('end', history.end_year, type=int)
+        if start > end:
+            raise IndexError(f"Start year {start} is after end year {end}")
+        return history.year_range(start, end)
+    return history_response(run_id, select)
+
+@app.route('/api/runs/<run_id>/cells/<int:row>/<int:col>')
+def run_cell(run_id, row, col):
+    def select(history):
+        _, rows, cols, _ = history.shape
+        if row >= rows or col >= cols:
+            raise IndexError(f"Cell ({row}, {col}) is outside the {rows}x{cols} grid")
+        return history.cell(row, col)
+    return history_response(run_id, select)
+
+@app.route('/health/rooms')
+def room_health():
+    """Messages and bytes sent per room and event since start-up."""
+    return rooms.stats()
+
+@app.route('/health/pool')
+def pool_health():
+    if not worker_pool.running:
+        return {"healthy": True, "running": False, "processes": worker_pool.processes}
+    status = worker_pool.health_check()
+    status["running"] = True
+    return status, 200 if status["healthy"] else 503
+
 @app.route('/static/<path:filename>')
 def serve_static(filename):
     print(f'[INFO] Serving static file: {filename}')
@@ -97,5 +664,10 @@ def serve_static(filename):
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    worker_pool.start()
+    # Fork the report plot workers too while the server has no other threads yet
+    reports_pool = plot_pool()
+    if reports_pool is not None:
+        reports_pool.start()
     print(f'[INFO] Starting server on port {port}')
     socketio.run(app, host='0.0.0.0', port=port, debug=True, allow_unsafe_werkzeug=True)
@@ -0,0 +1,72 @@
+import os
+import sys
+import sysconfig
+from concurrent.futures import ThreadPoolExecutor
+
+BACKENDS = ('auto', 'serial', 'thread', 'process')
+# Below this many cells a year takes well under a millisecond and any dispatch costs more than it saves
+THREAD_MIN_CELLS = 16384
+# Below this many cell-years the whole run finishes in about a second serially
+SERIAL_MAX_CELL_YEARS = 2_000_000
+# Grids this large keep every worker process busy long enough to amortise the per-year IPC
+PROCESS_MIN_CELLS = 250_000
+
+def available_cores():
+    """Cores this process may run on (respects CPU affinity where the OS reports it)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def gil_disabled():
+    """Whether this is a free-threaded CPython build running without the GIL."""
+    if not sysconfig.get_config_var('Py_GIL_DISABLED'):
+        return False
+    return not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+def select_backend(rows, cols, years, cores=None, requested='auto', tileable=True):
+    """Pick the backend for a run; returns ``(name, reason)``.
+
+    ``requested`` other than ``auto`` is honoured unless the run cannot be
+    split into row tiles (``tileable`` false), in which case it runs
+    serially. ``auto`` keeps small jobs serial, uses threads for mid-sized
+    grids (NumPy releases the GIL inside its kernels) and worker processes
+    only for large grids; on a free-threaded build threads are used
+    throughout.
+    """
+    if requested not in BACKENDS:
+        raise ValueError(f"Unknown backend '{requested}', expected one of: {', '.join(BACKENDS)}")
+    cores = cores or available_cores()
+    cells = rows * cols
+    if requested != 'auto':
+        if requested != 'serial' and not tileable:
+            print(f"[WARNING] This run cannot be split into row tiles; using the serial backend instead of '{requested}'")
+            return 'serial', 'not tileable'
+        return requested, 'requested'
+    if not tileable:
+        return 'serial', 'not tileable'
+    if cores < 2:
+        return 'serial', 'single core'
+    if cells < THREAD_MIN_CELLS or cells * years < SERIAL_MAX_CELL_YEARS:
+        return 'serial', f'small job ({cells} cells x {years} years)'
+    if gil_disabled():
+        return 'thread', f'free-threaded build ({cores} cores)'
+    if cells >= PROCESS_MIN_CELLS:
+        return 'process', f'large grid ({cells} cells, {cores} cores)'
+    return 'thread', f'mid-sized grid ({cells} cells, {cores} cores)'
+
+class ThreadBackend:
+    """A thread pool for tile stepping; tiles share the parent's arrays, so nothing is copied."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or available_cores()
+        self._executor = None
+
+    def map(self, fn, items):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='sim-tile')
+        return list(self._executor.map(fn, items))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,251 @@
+"""Offline benchmark of the simulation and report pipeline.
+
+    python -m backend.benchmark --grids 20x20,200x200 --years 10,50 --backends serial,thread,process --cores 1,4
+    python -m backend.benchmark --output new.json --baseline baseline.json
+
+Each run times the simulation per (grid, years, backend, cores) and the
+report phases (JSON serialisation, AI summary, plotting and PDF assembly)
+per (grid, years), with plotting and PDF assembly once per render profile,
+and writes machine-readable JSON with hardware details.
+The AI summary is a local stub, so nothing touches the network. With
+``--baseline`` the results are compared against an earlier file and the
+exit status is 1 if any phase regressed beyond ``--threshold``.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import datetime
+import numpy as np
+import psutil
+from .simulation import run_simulation
+from .history import legacy_results
+from .backends import BACKENDS, available_cores
+from .worker_pool import WorkerPool
+from .pdf_report import generate_pdf_report, render_plots
+from .plotting import RENDER_PROFILES
+
+BENCHMARK_VERSION = 1
+RATES = {"alpha": 0.1, "beta": 0.02, "gamma": 0.3, "delta": 0.01}
+# Animals per cell at the start of every benchmark run
+RABBITS_PER_CELL = 10
+WOLVES_PER_CELL = 1
+
+def hardware_info():
+    memory = psutil.virtual_memory()
+    frequency = psutil.cpu_freq()
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "logical_cpus": psutil.cpu_count(),
+        "physical_cpus": psutil.cpu_count(logical=False),
+        "available_cores": available_cores(),
+        "cpu_max_mhz": frequency.max if frequency else None,
+        "memory_total_mb": memory.total / 1024 / 1024
+    }
+
+def stub_summary(results):
+    """Stand-in for ``generate_ai_summary``: builds the same JSON prompt payload, answers locally."""
+    payload = json.dumps(legacy_results(results), indent=2)
+    rabbits, wolves = results['total_rabbits_by_year'], results['total_wolves_by_year']
+    return (f"Benchmark summary ({len(payload)} bytes of prompt data): rabbits went from {rabbits[0]} to "
+            f"{rabbits[-1]}, wolves from {wolves[0]} to {wolves[-1]}.")
+
+def _timed(fn, repeat, warmup=0):
+    for _ in range(warmup):
+        fn()
+    runs = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    return result, {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs
+    }
+
+def simulation_params(rows, cols, years):
+    return dict(
+        start_year=2000, end_year=2000 + years - 1,
+        rabbits=RABBITS_PER_CELL * rows * cols, wolves=WOLVES_PER_CELL * rows * cols,
+        rows=rows, cols=cols, **RATES
+    )
+
+def bench_simulation(rows, cols, years, backend, cores, repeat, pool=None):
+    params = simulation_params(rows, cols, years)
+    results, seconds = _timed(
+        lambda: run_simulation(backend=backend, workers=cores, pool=pool, **params), repeat, warmup=1
+    )
+    return {
+        "id": f"simulation/{rows}x{cols}/{years}y/{backend}/{cores}c",
+        "phase": "simulation",
+        "rows": rows, "cols": cols, "years": years, "backend": results['backend'], "cores": cores,
+        "seconds": seconds,
+        "cells_per_second": rows * cols * (years - 1) / seconds["median"]
+    }, results
+
+def bench_report(results, rows, cols, years, repeat, profiles=tuple(RENDER_PROFILES)):
+    """Time serialisation, the stubbed summary, and plotting and PDF assembly per render profile for one finished run."""
+    params = simulation_params(rows, cols, years)
+    entries = []
+
+    def entry(phase, seconds, profile=None, **extra):
+        entries.append(dict({
+            "id": f"{phase}/{rows}x{cols}/{years}y" + (f"/{profile}" if profile else ""), "phase": phase,
+            "rows": rows, "cols": cols, "years": years, "seconds": seconds
+        }, **({"profile": profile} if profile else {}), **extra))
+
+    payload, seconds = _timed(lambda: json.dumps(legacy_results(results)), repeat)
+    entry("serialization", seconds, bytes=len(payload))
+    summary, seconds = _timed(lambda: stub_summary(results), repeat)
+    entry("summary", seconds)
+    for profile in profiles:
+        with tempfile.TemporaryDirectory(prefix='sim-bench-') as outdir:
+            np.random.seed(0)
+            plot_ms = {}
+            plots, seconds = _timed(lambda: render_plots(
+                results, os.path.join(outdir, 'plots'), timings=plot_ms, profile=profile
+            ), repeat)
+            entry("plots", seconds, profile, bytes=sum(os.path.getsize(path) for path in plots.values()),
+                  plot_ms=plot_ms)
+            pdf_path, seconds = _timed(lambda: generate_pdf_report(
+                results, summary, params, results['execution_time'], results['cores_used'],
+                results['performance_data'], output_dir=outdir, plots=plots, profile=profile
+            ), repeat)
+            entry("pdf", seconds, profile, bytes=os.path.getsize(pdf_path))
+    return entries
+
+def run_benchmarks(grids, years_list, backends, core_counts, repeat=3, report=True, report_repeat=1,
+                   profiles=tuple(RENDER_PROFILES)):
+    """Run the whole matrix; returns the JSON-ready document."""
+    available = available_cores()
+    entries = []
+    skipped = []
+    pools = {}
+    try:
+        for rows, cols in grids:
+            for years in years_list:
+                last_results = None
+                for backend in backends:
+                    for cores in core_counts if backend in ('thread', 'process') else [1]:
+                        if cores > available:
+                            skip = {"backend": backend, "cores": cores, "reason": f"only {available} cores available"}
+                            if skip not in skipped:
+                                skipped.append(skip)
+                            continue
+                        pool = None
+                        if backend == 'process':
+                            if cores not in pools:
+                                pools[cores] = WorkerPool(processes=cores, preload=())
+                                pools[cores].start()
+                            pool = pools[cores]
+                        print(f'[INFO] Benchmarking {rows}x{cols}, {years} years, {backend} x{cores}')
+                        entry, last_results = bench_simulation(rows, cols, years, backend, cores, repeat, pool)
+                        entries.append(entry)
+                if report and last_results is not None:
+                    print(f'[INFO] Benchmarking report pipeline for {rows}x{cols}, {years} years')
+                    entries.extend(bench_report(last_results, rows, cols, years, report_repeat, profiles))
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+    return {
+        "version": BENCHMARK_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec='seconds'),
+        "hardware": hardware_info(),
+        "settings": {
+            "grids": [f"{rows}x{cols}" for rows, cols in grids], "years": years_list,
+            "backends": backends, "cores": core_counts, "repeat": repeat,
+            "report": report, "report_repeat": report_repeat, "profiles": list(profiles)
+        },
+        "results": entries,
+        "skipped": skipped
+    }
+
+def compare(current, baseline, threshold=0.10):
+    """Match entries by id and flag those whose median time grew by more than ``threshold``."""
+    previous = {entry["id"]: entry for entry in baseline["results"]}
+    rows = []
+    for entry in current["results"]:
+        old = previous.get(entry["id"])
+        if old is None:
+            continue
+        now, before = entry["seconds"]["median"], old["seconds"]["median"]
+        change = (now - before) / before if before else 0.0
+        rows.append({
+            "id": entry["id"], "baseline": before, "current": now, "change": change,
+            "regression": change > threshold
+        })
+    return rows
+
+def print_comparison(rows, threshold):
+    print(f"{'benchmark':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        flag = '  REGRESSION' if row["regression"] else ''
+        print(f"{row['id']:<48} {row['baseline']:>9.4f}s {row['current']:>9.4f}s {row['change']:>+7.1%}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"{regressions} of {len(rows)} benchmarks regressed by more than {threshold:.0%}")
+
+def _grid(text):
+    rows, _, cols = text.lower().partition('x')
+    return int(rows), int(cols or rows)
+
+def _ints(text):
+    return [int(value) for value in text.split(',') if value]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m backend.benchmark', description=__doc__.splitlines()[0])
+    parser.add_argument('--grids', default='20x20,200x200,1000x1000', help='comma-separated ROWSxCOLS list')
+    parser.add_argument('--years', default='10,50', type=_ints, help='comma-separated year counts')
+    parser.add_argument('--backends', default='serial,thread,process', help=f"subset of {', '.join(BACKENDS[1:])}")
+    parser.add_argument('--cores', default=None, type=_ints, help='comma-separated worker counts (default: 1 and all)')
+    parser.add_argument('--repeat', default=3, type=int, help='timed runs per simulation benchmark')
+    parser.add_argument('--report-repeat', default=1, type=int, help='timed runs per report phase')
+    parser.add_argument('--no-report', action='store_true', help='skip the plotting/PDF phases')
+    parser.add_argument('--profiles', default=','.join(RENDER_PROFILES), help='render profiles to time the plotting/PDF phases with')
+    parser.add_argument('--output', default='benchmark.json', help='where to write the results')
+    parser.add_argument('--input', help='compare an existing results file instead of running')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--threshold', default=0.10, type=float, help='relative slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input) as f:
+            current = json.load(f)
+    else:
+        backends = [name for name in args.backends.split(',') if name]
+        unknown = set(backends) - set(BACKENDS[1:])
+        if unknown:
+            parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+        cores = args.cores or sorted({1, available_cores()})
+        profiles = [name for name in args.profiles.split(',') if name]
+        unknown = set(profiles) - set(RENDER_PROFILES)
+        if unknown:
+            parser.error(f"unknown render profiles: {', '.join(sorted(unknown))}")
+        current = run_benchmarks(
+            [_grid(text) for text in args.grids.split(',') if text], args.years, backends, cores,
+            repeat=args.repeat, report=not args.no_report, report_repeat=args.report_repeat, profiles=profiles
+        )
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f'[INFO] Wrote {len(current["results"])} benchmark results to {args.output}')
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.threshold)
+        print_comparison(rows, args.threshold)
+        return 1 if any(row["regression"] for row in rows) else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+class CheckpointPolicy:
+    """When to write checkpoints: every ``every_years`` simulated years and/or ``every_seconds`` of wall time."""
+
+    def __init__(self, path, every_years=None, every_seconds=None):
+        if every_years is not None and every_years < 1:
+            raise ValueError("Checkpoint interval in years must be at least 1")
+        if every_seconds is not None and every_seconds <= 0:
+            raise ValueError("Checkpoint interval in seconds must be positive")
+        self.path = path
+        self.every_years = every_years
+        self.every_seconds = every_seconds
+        self.last_year_idx = 0
+        self.last_time = time.time()
+        self.count = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.seconds_last = 0.0
+
+    def due(self, year_idx):
+        if self.every_years and year_idx - self.last_year_idx >= self.every_years:
+            return True
+        return bool(self.every_seconds) and time.time() - self.last_time >= self.every_seconds
+
+    def write(self, year_idx, arrays, meta):
+        started = time.perf_counter()
+        self.bytes = save_checkpoint(self.path, arrays, meta)
+        self.seconds_last = time.perf_counter() - started
+        self.seconds += self.seconds_last
+        self.count += 1
+        self.last_year_idx = year_idx
+        self.last_time = time.time()
+
+    def summary(self):
+        return {
+            "path": self.path,
+            "count": self.count,
+            "seconds": self.seconds,
+            "bytes": self.bytes,
+            "everyYears": self.every_years,
+            "everySeconds": self.every_seconds
+        }
+
+def save_checkpoint(path, arrays, meta):
+    """Atomically write ``arrays`` plus JSON ``meta`` to an uncompressed ``.npz``; returns its size."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    header = dict(meta, version=CHECKPOINT_VERSION)
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, meta=np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8), **arrays)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+def load_checkpoint(path):
+    """Read a checkpoint back as ``(arrays, meta)``."""
+    with np.load(path) as data:
+        meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+        arrays = {key: data[key] for key in data.files if key != 'meta'}
+    if meta.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {meta.get('version')} in {path}")
+    return arrays, meta
@@ -0,0 +1,34 @@
+import numpy as np
+
+class ConvergenceMonitor:
+    """Decides when a run can stop before ``end_year``.
+
+    A run stops on ``extinction`` as soon as no cell holds any animals, and
+    on ``steady_state`` once, for ``patience`` consecutive years, every cell
+    changed by at most ``cell_tol`` and the global totals by at most
+    ``global_tol`` (both relative, with a floor of one animal so empty and
+    near-empty cells do not dominate).
+    """
+
+    def __init__(self, cell_tol=1e-6, global_tol=1e-6, patience=3):
+        if cell_tol < 0 or global_tol < 0 or patience < 1:
+            raise ValueError("Convergence tolerances must not be negative and patience must be at least 1")
+        self.cell_tol = cell_tol
+        self.global_tol = global_tol
+        self.patience = patience
+        self.quiet_years = 0
+
+    def check(self, grid, previous, live_cells):
+        """Return the stop reason after a year went from ``previous`` to ``grid``, or None."""
+        if live_cells == 0:
+            return 'extinction'
+        change = np.abs(grid - previous)
+        cell_change = float(np.max(change / np.maximum(np.abs(previous), 1.0)))
+        totals = grid.reshape(-1, 2).sum(axis=0)
+        previous_totals = previous.reshape(-1, 2).sum(axis=0)
+        global_change = float(np.max(np.abs(totals - previous_totals) / np.maximum(previous_totals, 1.0)))
+        if cell_change <= self.cell_tol and global_change <= self.global_tol:
+            self.quiet_years += 1
+        else:
+            self.quiet_years = 0
+        return 'steady_state' if self.quiet_years >= self.patience else None
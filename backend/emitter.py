@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+from collections import deque
+
+EMIT_POLICIES = ('coalesce', 'drop', 'block')
+DEFAULT_QUEUE_SIZE = 256
+# Per-year snapshots that a newer one supersedes; everything else is always delivered
+SNAPSHOT_EVENTS = ('year_update', 'performance_update', 'grid_snapshot')
+
+def emit_settings(options):
+    """``(max_queue, policy)`` from the ``emit_queue`` and ``emit_policy`` keys of a start payload, defaulting to ``SIM_EMIT_*``."""
+    max_queue = int(options.get('emit_queue', os.environ.get('SIM_EMIT_QUEUE', DEFAULT_QUEUE_SIZE)))
+    policy = str(options.get('emit_policy', os.environ.get('SIM_EMIT_POLICY', 'coalesce')))
+    if policy not in EMIT_POLICIES:
+        raise ValueError(f"Unknown emit policy '{policy}', expected one of: {', '.join(EMIT_POLICIES)}")
+    if max_queue < 1:
+        raise ValueError("emit_queue must be >= 1")
+    return max_queue, policy
+
+class EmitterPipeline:
+    """Moves event emission off the compute thread through a bounded queue.
+
+    ``emit`` only queues the event; a daemon thread hands queued events to
+    ``target.emit`` in order, so a slow transport or client no longer stalls
+    the yearly loop. When ``max_queue`` events are waiting, ``policy``
+    decides what happens to a new per-year snapshot (``year_update``,
+    ``performance_update``, ``grid_snapshot``): ``coalesce`` replaces the newest queued snapshot
+    of the same event with it, ``drop`` discards it, and ``block`` makes the
+    producer wait. Other events are never dropped and wait for room. The
+    latest snapshot of each event always reaches the target by ``close``.
+    """
+
+    def __init__(self, target, max_queue=DEFAULT_QUEUE_SIZE, policy='coalesce'):
+        max_queue, policy = emit_settings({"emit_queue": max_queue, "emit_policy": policy})
+        self.target = target
+        self.max_queue = max_queue
+        self.policy = policy
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+        self._queue = deque()
+        # Snapshots dropped since the last one went out, kept so the final state is never lost
+        self._held = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='sim-emitter', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_options(cls, target, options):
+        max_queue, policy = emit_settings(options)
+        return cls(target, max_queue=max_queue, policy=policy)
+
+    def emit(self, event, data=None):
+        with self._cond:
+            if self._closed:
+                # After close the pipeline is a pass-through for the caller's own thread
+                self.target.emit(event, data)
+                return
+            if len(self._queue) >= self.max_queue and event in SNAPSHOT_EVENTS and self.policy != 'block':
+                if self.policy == 'drop':
+                    self._held[event] = data
+                    self.dropped += 1
+                    return
+                for index in range(len(self._queue) - 1, -1, -1):
+                    if self._queue[index][0] == event:
+                        self._queue[index] = (event, data)
+                        self.coalesced += 1
+                        return
+            if len(self._queue) >= self.max_queue:
+                started = time.perf_counter()
+                while len(self._queue) >= self.max_queue:
+                    self._cond.wait()
+                self.blocked_seconds += time.perf_counter() - started
+            self._held.pop(event, None)
+            self._queue.append((event, data))
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                event, data = self._queue.popleft()
+                self._cond.notify_all()
+            try:
+                self.target.emit(event, data)
+                self.sent += 1
+            except Exception as e:
+                print(f"[WARNING] Could not emit '{event}': {str(e)}")
+
+    def close(self):
+        """Deliver everything still queued plus any held-back final snapshots, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        with self._cond:
+            held, self._held = self._held, {}
+        for event, data in held.items():
+            self.target.emit(event, data)
+            self.sent += 1
+        if hasattr(self.target, 'close'):
+            self.target.close()
+        if self.dropped or self.coalesced:
+            print(f'[INFO] Emitter sent {self.sent} events, dropped {self.dropped} and coalesced {self.coalesced}')
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "maxDepth": self.max_depth,
+            "blockedMs": self.blocked_seconds * 1000
+        }
@@ -0,0 +1,196 @@
+import zlib
+import threading
+import numpy as np
+from .emitter import EmitterPipeline
+
+GRID_DTYPES = ('float32', 'uint16')
+DEFAULT_KEYFRAME_EVERY = 50
+UINT16_MAX = 65535
+# Grid snapshots waiting for the encoder thread; each one is a full copy of the grid
+MAX_QUEUED_SNAPSHOTS = 4
+
+class GridStreamEncoder:
+    """Encodes per-year ``(rows, cols, 2)`` grids as keyframes and sparse delta frames.
+
+    A keyframe carries every cell; the frames in between carry only the
+    cells whose rabbit or wolf count moved more than ``threshold`` away from
+    what the client last received, so small drifts never accumulate, and
+    fall back to a keyframe whenever that would be smaller. With
+    ``uint16`` values are quantised per frame and species to
+    ``round(value / scale)``; ``compress`` deflates the payload with zlib.
+    The layout is described in the README (Grid frames).
+    """
+
+    def __init__(self, rows, cols, keyframe_every=DEFAULT_KEYFRAME_EVERY, threshold=0.0, dtype='float32', compress=False):
+        if dtype not in GRID_DTYPES:
+            raise ValueError(f"Unknown grid frame dtype '{dtype}', expected one of: {', '.join(GRID_DTYPES)}")
+        if keyframe_every < 1 or threshold < 0:
+            raise ValueError("keyframe_every must be >= 1 and threshold >= 0")
+        self.rows, self.cols = rows, cols
+        self.keyframe_every = keyframe_every
+        self.threshold = threshold
+        self.dtype = dtype
+        self.compress = compress
+        self.frames = 0
+        self.bytes = 0
+        # What the client holds after decoding every frame sent so far
+        self._reference = None
+        self._rounding = None
+
+    def _pack(self, values):
+        """Values (n, 2) as the two species columns plus their scales."""
+        if self.dtype == 'float32':
+            return [values[:, species].astype('<f4').tobytes() for species in (0, 1)], [1.0, 1.0]
+        planes, scales = [], []
+        for species in (0, 1):
+            column = np.maximum(values[:, species], 0)
+            peak = float(column.max()) if column.size else 0.0
+            scale = peak / UINT16_MAX if peak > 0 else 1.0
+            planes.append(np.rint(column / scale).astype('<u2').tobytes())
+            scales.append(scale)
+        return planes, scales
+
+    def _unpack(self, planes, scales):
+        """The values the decoder will reconstruct from ``planes``."""
+        kind = '<f4' if self.dtype == 'float32' else '<u2'
+        return np.stack([np.frombuffer(plane, dtype=kind) * scale for plane, scale in zip(planes, scales)], axis=1)
+
+    def encode(self, year, grid):
+        flat = grid.reshape(-1, 2)
+        keyframe = self._reference is None or self.frames % self.keyframe_every == 0
+        if not keyframe:
+            # Changes within the encoding's own rounding do not count as moves
+            tolerance = np.maximum(self.threshold, self._rounding)
+            moved = np.abs(flat.astype(self._reference.dtype) - self._reference) > tolerance
+            indices = np.flatnonzero(moved[:, 0] | moved[:, 1]).astype('<u4')
+            # A delta costs an index plus two values per cell; past the break-even point a keyframe is smaller
+            value_bytes = np.dtype(self.dtype).itemsize
+            keyframe = indices.size * (4 + 2 * value_bytes) >= flat.shape[0] * 2 * value_bytes
+        if keyframe:
+            indices = None
+            values = flat
+        else:
+            values = flat[indices]
+        planes, scales = self._pack(values)
+        decoded = self._unpack(planes, scales)
+        if keyframe:
+            self._reference = decoded.astype(np.float32 if self.dtype == 'float32' else np.float64)
+            self._rounding = np.array([0.0, 0.0]) if self.dtype == 'float32' else np.array(scales) / 2
+        else:
+            self._reference[indices] = decoded
+        data = b''.join(([] if keyframe else [indices.tobytes()]) + planes)
+        if self.compress:
+            data = zlib.compress(data, 6)
+        self.frames += 1
+        self.bytes += len(data)
+        return {
+            "year": year,
+            "kind": "key" if keyframe else "delta",
+            "rows": self.rows,
+            "cols": self.cols,
+            "count": len(values),
+            "dtype": self.dtype,
+            "scales": scales,
+            "compressed": self.compress,
+            "data": data
+        }
+
+class GridStreamDecoder:
+    """Reference decoder for ``grid_frame`` events; ``grid`` holds the latest ``(rows, cols, 2)`` state."""
+
+    def __init__(self):
+        self.grid = None
+        self.year = None
+
+    def decode(self, frame):
+        data = zlib.decompress(frame["data"]) if frame["compressed"] else frame["data"]
+        rows, cols, count = frame["rows"], frame["cols"], frame["count"]
+        kind = '<f4' if frame["dtype"] == 'float32' else '<u2'
+        offset = 0
+        indices = None
+        if frame["kind"] == "delta":
+            if self.grid is None:
+                raise ValueError("Delta frame received before a keyframe")
+            indices = np.frombuffer(data, dtype='<u4', count=count)
+            offset = 4 * count
+        flat = self.grid.reshape(-1, 2) if indices is not None else np.zeros((rows * cols, 2))
+        for species, scale in enumerate(frame["scales"]):
+            plane = np.frombuffer(data, dtype=kind, count=count, offset=offset) * scale
+            offset += plane.size * np.dtype(kind).itemsize
+            if indices is None:
+                flat[:, species] = plane
+            else:
+                flat[indices, species] = plane
+        self.grid = flat.reshape(rows, cols, 2)
+        self.year = frame["year"]
+        return self.grid
+
+class GridStream:
+    """Per-run grid frame source that clients can subscribe to while the run is going.
+
+    ``run_simulation`` calls ``send(year_idx, year, grid)`` after every
+    year; nothing is encoded until ``subscribe`` sets the options and
+    ``socketio`` is attached, and every new subscription starts with a
+    keyframe. ``every`` sends only every n-th year. The settings belong to
+    the stream, so all of a job's subscribers share them. After ``attach``
+    ``send`` only queues a copy of the grid; frames are encoded on the
+    pipeline thread against what the client last received, so snapshots
+    can be coalesced or dropped without breaking the delta chain.
+    """
+
+    def __init__(self, socketio=None):
+        self.socketio = socketio
+        self.pipeline = None
+        self._options = None
+        self._encoder = None
+        self._lock = threading.Lock()
+
+    def attach(self, target, max_queue=MAX_QUEUED_SNAPSHOTS, policy='coalesce'):
+        """Send frames to ``target`` from an encoder thread; returns the pipeline, to be closed after the run."""
+        self.socketio = target
+        self.pipeline = EmitterPipeline(self, max_queue=max_queue, policy=policy)
+        return self.pipeline
+
+    def subscribe(self, keyframe_every=DEFAULT_KEYFRAME_EVERY, threshold=0.0, dtype='float32', compress=False, every=1,
+                  replace=False):
+        """Start (or restart) encoding; other settings than the current ones need ``replace``, which affects every subscriber."""
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        # Validate now so a bad subscription fails for the caller, not inside the run
+        GridStreamEncoder(1, 1, keyframe_every, threshold, dtype, compress)
+        options = {"keyframe_every": keyframe_every, "threshold": threshold, "dtype": dtype, "compress": compress}
+        with self._lock:
+            if self._options is not None and not replace and (self._options, self._every) != (options, every):
+                raise ValueError(f"The job's grid stream is already sent with {dict(self._options, every=self._every)}")
+            self._options = options
+            self._every = every
+            self._encoder = None
+
+    def unsubscribe(self):
+        with self._lock:
+            self._options = None
+            self._encoder = None
+
+    @property
+    def subscribed(self):
+        return self._options is not None
+
+    def send(self, year_idx, year, grid):
+        with self._lock:
+            if self._options is None or self.socketio is None or year_idx % self._every:
+                return
+        if self.pipeline is not None:
+            self.pipeline.emit('grid_snapshot', (year, grid.copy()))
+        else:
+            self.emit('grid_snapshot', (year, grid))
+
+    def emit(self, event, data):
+        """Encode a ``grid_snapshot`` and send it on as a ``grid_frame``; the target side of ``attach``'s pipeline."""
+        year, grid = data
+        with self._lock:
+            if self._options is None:
+                return
+            if self._encoder is None:
+                self._encoder = GridStreamEncoder(grid.shape[0], grid.shape[1], **self._options)
+            frame = self._encoder.encode(year, grid)
+        self.socketio.emit('grid_frame', frame)
@@ -0,0 +1,140 @@
+import os
+import numpy as np
+
+HISTORY_DTYPES = ('float32', 'int32', 'float64')
+
+class GridHistory:
+    """Per-cell populations of every year in one preallocated (years, rows, cols, 2) array.
+
+    ``year`` and ``cell`` return views, so reading a year's grid or a cell's
+    time series copies nothing. The legacy list-of-dicts format is only built
+    by ``to_legacy`` for the boundaries that still need it. Integer storage
+    truncates like the legacy ``int()`` conversion.
+    """
+
+    def __init__(self, start_year, years, rows, cols, dtype='float32', data=None):
+        if str(np.dtype(dtype)) not in HISTORY_DTYPES:
+            raise ValueError(f"Unknown history dtype '{dtype}', expected one of: {', '.join(HISTORY_DTYPES)}")
+        self.start_year = start_year
+        self.dtype = np.dtype(dtype)
+        self.data = data if data is not None else np.zeros((years, rows, cols, 2), dtype=self.dtype)
+        self.recorded = 0
+
+    @classmethod
+    def on_disk(cls, path, start_year, years, rows, cols, dtype='float32'):
+        """A history backed by a memory-mapped ``.npy`` file at ``path`` instead of RAM.
+
+        The year-major layout keeps every year's grid contiguous on disk, so
+        a year is one sequential read and a cell's series touches one page
+        per year, independent of how large the whole run is.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = np.lib.format.open_memmap(path, mode='w+', dtype=np.dtype(dtype), shape=(years, rows, cols, 2))
+        return cls(start_year, years, rows, cols, dtype, data=data)
+
+    @classmethod
+    def load(cls, path, start_year, recorded=None, mode='r'):
+        """Map an existing history file without reading it into memory."""
+        data = np.load(path, mmap_mode=mode)
+        years, rows, cols, _ = data.shape
+        history = cls(start_year, years, rows, cols, data.dtype, data=data)
+        history.recorded = years if recorded is None else recorded
+        return history
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def years(self):
+        return self.data.shape[0]
+
+    @property
+    def end_year(self):
+        return self.start_year + self.years - 1
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    @property
+    def path(self):
+        """File backing the history, or None when it lives in RAM."""
+        return getattr(self.data, 'filename', None)
+
+    def flush(self):
+        if isinstance(self.data, np.memmap):
+            self.data.flush()
+
+    @staticmethod
+    def bytes_per_cell_year(dtype='float32'):
+        return 2 * np.dtype(dtype).itemsize
+
+    def _store(self, target, grid):
+        if self.dtype.kind == 'i':
+            limit = np.iinfo(self.dtype).max
+            np.copyto(target, np.clip(grid, 0, limit), casting='unsafe')
+        else:
+            np.copyto(target, grid, casting='same_kind')
+
+    def record(self, year_idx, grid):
+        self._store(self.data[year_idx], grid)
+        self.recorded = max(self.recorded, year_idx + 1)
+
+    def fill(self, from_idx, grid):
+        """Repeat ``grid`` for every year from ``from_idx`` on."""
+        if from_idx < self.years:
+            self._store(self.data[from_idx:], grid)
+        self.recorded = self.years
+
+    def _index(self, year):
+        index = year - self.start_year
+        if not 0 <= index < self.years:
+            raise IndexError(f"Year {year} is outside {self.start_year}-{self.end_year}")
+        return index
+
+    def year(self, year):
+        """(rows, cols, 2) view of one simulated year."""
+        return self.data[self._index(year)]
+
+    def year_range(self, start, end):
+        """(years, rows, cols, 2) view of the inclusive range ``start``-``end``."""
+        return self.data[self._index(start):self._index(end) + 1]
+
+    def cell(self, row, col):
+        """(years, 2) view of one cell's rabbit and wolf time series."""
+        return self.data[:, row, col]
+
+    def to_legacy(self):
+        """The old ``yearly_results`` format: per year, one dict per cell."""
+        legacy = []
+        for index in range(self.recorded):
+            counts = self.data[index].astype(np.int64).tolist()
+            year = self.start_year + index
+            legacy.append([
+                {"year": year, "grid": [r, c], "rabbits": cell[0], "wolves": cell[1]}
+                for r, row in enumerate(counts)
+                for c, cell in enumerate(row)
+            ])
+        return legacy
+
+# Server-side file locations among a run's parameters; never sent to clients
+SERVER_PARAMS = ('history_path', 'checkpoint_path')
+
+def public_params(params):
+    """``params`` without the server's file paths."""
+    return {key: value for key, value in params.items() if key not in SERVER_PARAMS}
+
+def legacy_results(results, max_cells=400):
+    """A JSON-safe copy of ``results`` with the history in the legacy ``yearly_results`` form.
+
+    Grids larger than ``max_cells`` (the old 20x20 cap) get an empty
+    ``yearly_results`` instead of millions of dicts.
+    """
+    legacy = {key: value for key, value in results.items() if key != 'history'}
+    if 'params' in legacy:
+        legacy['params'] = public_params(legacy['params'])
+    history = results.get('history')
+    small = results['rows'] * results['cols'] <= max_cells
+    legacy['yearly_results'] = history.to_legacy() if history is not None and small else []
+    return legacy
@@ -0,0 +1,74 @@
+import time
+
+class PhaseTimer:
+    """Wall time per named phase of a loop, for ``performance_data``.
+
+    ``lap(name)`` charges the time since the previous lap (or ``reset``) to
+    ``name``, both for the current period and for the run totals, so a
+    loop body is instrumented with one ``lap`` call after each phase.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.totals = {}
+        self.current = {}
+        self._last = time.perf_counter()
+
+    def reset(self):
+        """Start a new period (e.g. a year); the time since the last lap is dropped."""
+        self.current = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.current[name] = self.current.get(name, 0.0) + elapsed
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed
+        return elapsed
+
+    def current_ms(self):
+        return {name: seconds * 1000 for name, seconds in self.current.items()}
+
+    def totals_ms(self):
+        return {name: seconds * 1000 for name, seconds in self.totals.items()}
+
+class NullTimer:
+    """A switched-off ``PhaseTimer``: every call is a no-op."""
+
+    enabled = False
+    totals = {}
+    current = {}
+
+    def reset(self):
+        pass
+
+    def lap(self, name):
+        return 0.0
+
+    def current_ms(self):
+        return {}
+
+    def totals_ms(self):
+        return {}
+
+def make_timer(enabled=True):
+    return PhaseTimer() if enabled else NullTimer()
+
+def worker_usage(tile_results, wall_seconds):
+    """Busy time per worker from ``(seconds, stats, worker)`` tile results over a ``wall_seconds`` dispatch.
+
+    Returns the summed worker compute time, the dispatch overhead (wall time
+    beyond the busiest worker, i.e. IPC and scheduling) and each worker's
+    utilisation of the wall time.
+    """
+    busy = {}
+    for seconds, _, worker in tile_results:
+        busy[worker] = busy.get(worker, 0.0) + seconds
+    longest = max(busy.values(), default=0.0)
+    return {
+        "computeMs": sum(busy.values()) * 1000,
+        "overheadMs": max(0.0, wall_seconds - longest) * 1000,
+        "utilization": [min(1.0, seconds / wall_seconds) if wall_seconds else 0.0 for seconds in busy.values()]
+    }
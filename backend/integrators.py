@@ -0,0 +1,164 @@
+import numpy as np
+
+INTEGRATORS = ('euler', 'rk4', 'dopri5')
+
+# Dormand-Prince 5(4) tableau
+_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Difference between the 5th and embedded 4th order weights, used for the error estimate
+_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+def lotka_volterra_rhs(alpha, beta, gamma, delta):
+    """Build ``rhs(state, index=None)`` for states shaped (..., 2).
+
+    Rate parameters may be scalars or arrays with the shape of
+    ``state[..., 0]``; ``index`` selects the flat cells a partial state holds
+    so per-cell integrators can pass only the cells still stepping. The
+    operation order matches ``lotka_volterra_step`` so Euler results agree
+    bit for bit.
+    """
+    params = [np.asarray(p, dtype=float) for p in (alpha, beta, gamma, delta)]
+
+    def rhs(state, index=None):
+        a, b, g, d = params
+        if index is not None:
+            a, b, g, d = (p.reshape(-1)[index] if p.ndim else p for p in params)
+        rabbits = state[..., 0]
+        wolves = state[..., 1]
+        deriv = np.empty_like(state)
+        deriv[..., 0] = a * rabbits - b * rabbits * wolves
+        deriv[..., 1] = d * rabbits * wolves - g * wolves
+        return deriv
+
+    return rhs
+
+def _stats(method, steps, rejected, evaluations, max_cell_steps):
+    return {
+        "method": method,
+        "steps": int(steps),
+        "rejected_steps": int(rejected),
+        "function_evaluations": int(evaluations),
+        "max_cell_steps": int(max_cell_steps)
+    }
+
+def merge_stats(total, stats):
+    """Accumulate integrator statistics from several years or tiles into ``total``."""
+    if not stats:
+        return total
+    if not total:
+        return dict(stats)
+    for key in ("steps", "rejected_steps", "function_evaluations"):
+        total[key] += stats[key]
+    total["max_cell_steps"] = max(total["max_cell_steps"], stats["max_cell_steps"])
+    return total
+
+def euler(state, rhs, dt=0.1, span=1.0):
+    """Forward Euler over ``span`` years; ``dt`` is rounded so whole steps cover the span exactly."""
+    steps = max(1, int(round(span / dt)))
+    h = span / steps
+    y = np.array(state, dtype=float)
+    for _ in range(steps):
+        y += rhs(y) * h
+        np.maximum(y, 0, out=y)
+    cells = y.size // 2
+    return y, _stats('euler', steps * cells, 0, steps * cells, steps)
+
+def rk4(state, rhs, dt=0.1, span=1.0):
+    """Classic fixed-step fourth order Runge-Kutta over ``span`` years."""
+    steps = max(1, int(round(span / dt)))
+    h = span / steps
+    y = np.array(state, dtype=float)
+    for _ in range(steps):
+        k1 = rhs(y)
+        k2 = rhs(y + (0.5 * h) * k1)
+        k3 = rhs(y + (0.5 * h) * k2)
+        k4 = rhs(y + h * k3)
+        y += (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
+        np.maximum(y, 0, out=y)
+    cells = y.size // 2
+    return y, _stats('rk4', steps * cells, 0, 4 * steps * cells, steps)
+
+def dopri5(state, rhs, rtol=1e-6, atol=1e-6, per_cell=True, span=1.0, h0=0.1, max_steps=100000):
+    """Dormand-Prince 5(4) with error control over ``span`` years.
+
+    With ``per_cell`` every cell keeps its own step size, so calm cells take
+    a handful of large steps while cells near a population spike refine
+    locally. Coupled systems (where ``rhs`` needs the whole grid) must pass
+    ``per_cell=False``; all cells then share the step chosen by the worst one.
+    """
+    shape = state.shape
+    y = np.array(state, dtype=float).reshape(-1, 2)
+    n = y.shape[0]
+
+    if per_cell:
+        evaluate = rhs
+    else:
+        def evaluate(values, index):
+            return rhs(values.reshape(shape)).reshape(-1, 2)
+
+    t = np.zeros(n)
+    h = np.full(n, min(h0, span))
+    accepted = np.zeros(n, dtype=np.int64)
+    rejected = 0
+    evaluations = n
+    k_first = evaluate(y, np.arange(n))
+    end = span * (1 - 1e-12)
+    index = np.arange(n)
+    attempts = 0
+    while index.size:
+        attempts += 1
+        if attempts > max_steps:
+            raise RuntimeError(f"dopri5 exceeded {max_steps} steps; tolerances may be too tight")
+        yi = y[index]
+        hi = np.minimum(h[index], span - t[index])[:, None]
+        ks = [k_first[index]]
+        for stage in range(1, 7):
+            increment = sum(a * k for a, k in zip(_A[stage], ks) if a)
+            ks.append(evaluate(yi + hi * increment, index))
+        evaluations += 6 * index.size
+        y_new = yi + hi * sum(a * k for a, k in zip(_A[6], ks) if a)
+        error = hi * sum(e * k for e, k in zip(_E, ks) if e)
+        scale = atol + rtol * np.maximum(np.abs(yi), np.abs(y_new))
+        err = np.sqrt(np.mean((error / scale) ** 2, axis=1))
+        if not per_cell:
+            err[:] = err.max()
+        accept = err <= 1.0
+        done = index[accept]
+        clamped = np.maximum(y_new[accept], 0)
+        y[done] = clamped
+        t[done] += hi[accept, 0]
+        accepted[done] += 1
+        k_first[done] = ks[6][accept]
+        negative = (y_new[accept] < 0).any(axis=1)
+        if negative.any():
+            # Clamping moved the state, so the last stage is no longer its derivative
+            if per_cell:
+                k_first[done[negative]] = evaluate(clamped[negative], done[negative])
+                evaluations += int(negative.sum())
+            else:
+                k_first = evaluate(y, None)
+                evaluations += n
+        rejected += int((~accept).sum())
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * err ** -0.2, 0.2, 5.0)
+        h[index] = hi[:, 0] * factor
+        index = index[t[index] < end]
+    return y.reshape(shape), _stats('dopri5', accepted.sum(), rejected, evaluations, accepted.max() if n else 0)
+
+def integrate(state, rhs, method='euler', dt=0.1, rtol=1e-6, atol=1e-6, per_cell=True, span=1.0):
+    """Advance ``state`` by ``span`` years with the named integrator; returns (state, stats)."""
+    if method == 'euler':
+        return euler(state, rhs, dt=dt, span=span)
+    if method == 'rk4':
+        return rk4(state, rhs, dt=dt, span=span)
+    if method == 'dopri5':
+        return dopri5(state, rhs, rtol=rtol, atol=atol, per_cell=per_cell, span=span, h0=dt)
+    raise ValueError(f"Unknown integrator '{method}', expected one of: {', '.join(INTEGRATORS)}")
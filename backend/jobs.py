@@ -0,0 +1,195 @@
+import os
+import time
+import atexit
+import heapq
+import itertools
+import threading
+import traceback
+from .backends import available_cores
+
+JOB_STATES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+# Finished jobs whose results stay in memory; older ones keep only their status
+KEEP_RESULTS = 8
+# Finished jobs that stay listed at all; older ones are forgotten
+KEEP_FINISHED = 256
+
+class JobQueueFull(RuntimeError):
+    pass
+
+class Job:
+    """One queued or running unit of work and its outcome."""
+
+    def __init__(self, job_id, run, priority=0, metadata=None):
+        self.id = job_id
+        self.run = run
+        self.priority = priority
+        self.metadata = metadata or {}
+        self.state = 'queued'
+        self.cancel_event = threading.Event()
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.result = None
+        self.progress = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def status(self):
+        return {
+            "jobId": self.id,
+            "state": self.state,
+            "priority": self.priority,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": self.progress,
+            "error": self.error,
+            **self.metadata
+        }
+
+class JobManager:
+    """Runs jobs from a bounded priority queue on at most ``max_concurrent`` threads.
+
+    Higher ``priority`` runs first, ties in submission order. ``run(job)``
+    does the work and should poll ``job.cancel_event`` (simulations check
+    it between years, sweeps between chunks); its return value becomes ``job.result``. ``on_change``
+    is called with the job after every state change. A finished job lets go
+    of ``run`` (and whatever it holds); only the last ``KEEP_FINISHED`` stay
+    known, the last ``KEEP_RESULTS`` with their result.
+    """
+
+    def __init__(self, max_concurrent=None, max_queued=64, on_change=None):
+        self.max_concurrent = max_concurrent or default_concurrency()
+        self.max_queued = max_queued
+        self.on_change = on_change
+        self._queue = []
+        self._jobs = {}
+        self._finished = []
+        self._order = itertools.count()
+        self._lock = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, on_change=None):
+        max_concurrent = int(os.environ.get('SIM_MAX_CONCURRENT_RUNS', 0)) or None
+        max_queued = int(os.environ.get('SIM_MAX_QUEUED_RUNS', 64))
+        return cls(max_concurrent=max_concurrent, max_queued=max_queued, on_change=on_change)
+
+    def submit(self, job_id, run, priority=0, metadata=None):
+        job = Job(job_id, run, priority, metadata)
+        with self._lock:
+            if sum(entry[2].state == 'queued' for entry in self._queue) >= self.max_queued:
+                raise JobQueueFull(f"The job queue is full ({self.max_queued} waiting); try again later")
+            self._jobs[job_id] = job
+            heapq.heappush(self._queue, (-priority, next(self._order), job))
+            self._start_workers()
+            self._lock.notify()
+        self._changed(job)
+        return job
+
+    def _start_workers(self):
+        while len(self._threads) < self.max_concurrent:
+            thread = threading.Thread(target=self._work, name=f'sim-job-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                if job.state != 'queued':
+                    continue
+                job.state = 'running'
+                job.started = time.time()
+            self._changed(job)
+            try:
+                job.result = job.run(job)
+                job.state = 'cancelled' if job.cancelled else 'completed'
+            except Exception as e:
+                print(f'[ERROR] Job {job.id} failed: {str(e)}')
+                traceback.print_exc()
+                job.error = str(e)
+                job.state = 'failed'
+            job.finished = time.time()
+            self._retire(job)
+            self._changed(job)
+
+    def _retire(self, job):
+        with self._lock:
+            job.run = None
+            self._finished.append(job)
+            for old in self._finished[:-KEEP_RESULTS]:
+                old.result = None
+            for old in self._finished[:-KEEP_FINISHED]:
+                # A resumed run reuses its id, so only forget the entry if it is still this job
+                if self._jobs.get(old.id) is old:
+                    del self._jobs[old.id]
+            del self._finished[:-KEEP_FINISHED]
+
+    def _changed(self, job):
+        if self.on_change is not None:
+            try:
+                self.on_change(job)
+            except Exception as e:
+                print(f'[WARNING] Job status callback failed: {str(e)}')
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job '{job_id}'")
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued job at once, or ask a running one to stop after its current year."""
+        job = self.get(job_id)
+        with self._lock:
+            if job.state not in ('queued', 'running'):
+                return False
+            job.cancel_event.set()
+            queued = job.state == 'queued'
+            if queued:
+                job.state = 'cancelled'
+                job.finished = time.time()
+        if queued:
+            self._retire(job)
+        self._changed(job)
+        return True
+
+    def position(self, job_id):
+        """Place of a queued job in line (0 runs next), or None."""
+        with self._lock:
+            waiting = sorted(entry for entry in self._queue if entry[2].state == 'queued')
+        for index, (_, _, job) in enumerate(waiting):
+            if job.id == job_id:
+                return index
+        return None
+
+    def jobs(self):
+        return [job.status() for job in sorted(self._jobs.values(), key=lambda job: job.created)]
+
+    def shutdown(self):
+        """Stop taking jobs and ask queued and running ones to cancel."""
+        with self._lock:
+            self._closed = True
+            for _, _, job in self._queue:
+                job.cancel_event.set()
+            self._lock.notify_all()
+        for job in list(self._jobs.values()):
+            if job.state == 'running':
+                job.cancel_event.set()
+
+    def register_shutdown(self):
+        atexit.register(self.shutdown)
+        return self
+
+def default_concurrency():
+    """Concurrent runs for this host: one per two cores, between one and four."""
+    return max(1, min(4, available_cores() // 2))
@@ -1,7 +1,14 @@
 import os
+import time
 import datetime
+import threading
+import numpy as np
 from fpdf import FPDF
+from .backends import available_cores
+from .worker_pool import WorkerPool
 from .plotting import (
+    DEFAULT_RENDER_PROFILE,
+    render_profile,
     plot_population_trends, 
     plot_rabbit_wolf_ratio_pie, 
     plot_grid_visualization, 
@@ -9,30 +16,95 @@ from .plotting import (
     plot_population_ratio
 )
 
-def generate_pdf_report(results, summary, params, execution_time=None, cores_used=None, performance_data=None):
-    """Generate a comprehensive PDF report for the predator-prey simulation."""
-    static_dir = os.path.join(os.path.dirname(__file__), 'static')
-    os.makedirs(static_dir, exist_ok=True)
-    img_dir = os.path.join(static_dir, 'plots')
+# Report plots by name; each one is an independent render with its own figure
+PLOTS = {
+    "total": plot_population_trends,
+    "pie_start": lambda results, outdir, profile: plot_rabbit_wolf_ratio_pie(results, outdir, ('start',), profile)[0],
+    "pie_end": lambda results, outdir, profile: plot_rabbit_wolf_ratio_pie(results, outdir, ('end',), profile)[0],
+    "pie_avg": lambda results, outdir, profile: plot_rabbit_wolf_ratio_pie(results, outdir, ('avg',), profile)[0],
+    "grid": plot_grid_visualization,
+    "phase": plot_phase_space,
+    "ratio": plot_population_ratio
+}
+# The only parts of the results the plots read; the per-cell history is never shipped to the workers
+PLOT_FIELDS = ('total_rabbits_by_year', 'total_wolves_by_year', 'start_year', 'rows', 'cols', 'grid_data')
+
+_plot_pool = None
+_plot_pool_lock = threading.Lock()
+
+def plot_pool():
+    """Process pool for report plots, or None to render in-process.
+
+    Created on first use with ``SIM_PLOT_WORKERS`` processes (default: one
+    per plot, up to the available cores); 0 or 1 renders sequentially. The
+    server starts it at startup, since forking later from a job thread
+    could copy locks other threads hold.
+    """
+    global _plot_pool
+    processes = int(os.environ.get('SIM_PLOT_WORKERS', min(len(PLOTS), available_cores())))
+    if processes <= 1:
+        return None
+    with _plot_pool_lock:
+        if _plot_pool is None:
+            _plot_pool = WorkerPool(processes=processes, preload=('backend.plotting',)).register_shutdown()
+        return _plot_pool
+
+def _render_plot(task):
+    """Render one plot; returns ``(name, path, seconds)``."""
+    name, results, img_dir, profile, seed = task
+    # Workers do not share the caller's random state, so the grid plot is seeded from it explicitly
+    np.random.seed(seed)
+    started = time.perf_counter()
+    path = PLOTS[name](results, img_dir, profile)
+    return name, path, time.perf_counter() - started
+
+def render_plots(results, img_dir, pool=None, timings=None, profile=DEFAULT_RENDER_PROFILE):
+    """Render every report plot into ``img_dir`` with the given render profile; returns their paths by name.
+
+    The plots render concurrently on ``pool`` (a ``WorkerPool``, default
+    ``plot_pool()``), so the whole set takes about as long as the slowest
+    plot. ``timings`` is filled with each plot's render time in ms.
+    """
+    render_profile(profile)
     os.makedirs(img_dir, exist_ok=True)
-    
-    # --- Generate all plots sequentially (no threading) ---
-    print("[INFO] Generating plots sequentially...")
-    
-    # Generate population trend plot
-    total_plot = plot_population_trends(results, img_dir)
-    
-    # Generate pie charts
-    pie_start, pie_end, pie_avg = plot_rabbit_wolf_ratio_pie(results, img_dir)
-    
-    # Generate grid visualization
-    grid_plot = plot_grid_visualization(results, img_dir)
-    
-    # Generate phase space plot
-    phase_plot = plot_phase_space(results, img_dir)
-    
-    # Generate population ratio plot
-    ratio_plot = plot_population_ratio(results, img_dir)
+    data = {field: results[field] for field in PLOT_FIELDS if field in results}
+    tasks = [(name, data, img_dir, profile, int(np.random.randint(2 ** 31))) for name in PLOTS]
+    pool = pool or plot_pool()
+    rendered = None
+    if pool is not None:
+        print(f"[INFO] Generating {len(tasks)} plots on {pool.processes} processes...")
+        try:
+            rendered = pool.map(_render_plot, tasks, 1)
+        except Exception as e:
+            print(f"[WARNING] Parallel plot rendering failed, rendering sequentially: {str(e)}")
+    if rendered is None:
+        print("[INFO] Generating plots sequentially...")
+        rendered = [_render_plot(task) for task in tasks]
+    if timings is not None:
+        timings.update({name: seconds * 1000 for name, _, seconds in rendered})
+    return {name: path for name, path, _ in rendered}
+
+def generate_pdf_report(results, summary, params, execution_time=None, cores_used=None, performance_data=None,
+                        output_dir=None, plots=None, timer=None, plot_timings=None, profile=DEFAULT_RENDER_PROFILE):
+    """Generate a comprehensive PDF report for the predator-prey simulation.
+
+    The report and its plots go to ``output_dir`` (default: the static
+    folder), rendered with the ``profile`` of ``RENDER_PROFILES``; pass
+    ``plots`` from ``render_plots`` to reuse rendered images.
+    A ``PhaseTimer`` gets ``plots`` and ``pdf`` laps, and ``plot_timings``
+    the per-plot render times of ``render_plots``.
+    """
+    static_dir = output_dir or os.path.join(os.path.dirname(__file__), 'static')
+    os.makedirs(static_dir, exist_ok=True)
+    if plots is None:
+        plots = render_plots(results, os.path.join(static_dir, 'plots'), timings=plot_timings, profile=profile)
+        if timer is not None:
+            timer.lap('plots')
+    total_plot = plots["total"]
+    pie_start, pie_end, pie_avg = plots["pie_start"], plots["pie_end"], plots["pie_avg"]
+    grid_plot = plots["grid"]
+    phase_plot = plots["phase"]
+    ratio_plot = plots["ratio"]
     
     # Create PDF path
     pdf_path = os.path.join(static_dir, 'report.pdf')
@@ -276,6 +348,12 @@ def generate_pdf_report(results, summary, params, execution_time=None, cores_use
             pdf.cell(col_width, row_height, 'Average Time Per Year', 1, 0, 'L', fill)
             avg_time = execution_time / (params['end_year'] - params['start_year']) if execution_time else "N/A"
             pdf.cell(col_width, row_height, f"{avg_time:.4f} seconds" if isinstance(avg_time, float) else avg_time, 1, 1, 'L', fill)
+            fill = not fill
+
+        if results.get('backend'):
+            pdf.set_fill_color(230, 230, 240) if fill else pdf.set_fill_color(240, 240, 250)
+            pdf.cell(col_width, row_height, 'Compute Backend', 1, 0, 'L', fill)
+            pdf.cell(col_width, row_height, f"{results['backend']} ({results.get('backend_reason')})", 1, 1, 'L', fill)
     
     # Add population results page
     pdf.add_page()
@@ -611,6 +689,8 @@ def generate_pdf_report(results, summary, params, execution_time=None, cores_use
     # Save the PDF
     try:
         pdf.output(pdf_path)
+        if timer is not None:
+            timer.lap('pdf')
         print(f'[INFO] PDF report generated: {pdf_path}')
         return pdf_path
     except Exception as e:
@@ -7,7 +7,32 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 from matplotlib.colors import LinearSegmentedColormap
 
-def plot_population_trends(results, outdir):
+MAX_ANNOTATED_GRID = 40
+# Pie charts of plot_rabbit_wolf_ratio_pie, in the order it returns them
+PIE_CHARTS = ('start', 'end', 'avg')
+# How plots are written: ``preview`` for on-screen use, ``print`` for the full-quality report
+RENDER_PROFILES = {
+    "preview": {"dpi": 100, "bbox_inches": None, "format": "jpg", "pil_kwargs": {"quality": 80, "optimize": True}},
+    "print": {"dpi": 300, "bbox_inches": "tight", "format": "png", "pil_kwargs": {}}
+}
+DEFAULT_RENDER_PROFILE = 'print'
+
+def render_profile(name):
+    """Savefig settings of a ``RENDER_PROFILES`` entry."""
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{name}', expected one of: {', '.join(RENDER_PROFILES)}")
+    return RENDER_PROFILES[name]
+
+def save_figure(outdir, name, profile=DEFAULT_RENDER_PROFILE):
+    """Write the current figure as ``<outdir>/<name>.<ext>`` with the profile's settings, close it and return the path."""
+    settings = render_profile(profile)
+    fname = os.path.join(outdir, f"{name}.{settings['format']}")
+    plt.savefig(fname, dpi=settings['dpi'], bbox_inches=settings['bbox_inches'], format=settings['format'],
+                pil_kwargs=settings['pil_kwargs'])
+    plt.close()  # Important: close the figure to free memory
+    return fname
+
+def plot_population_trends(results, outdir, profile=DEFAULT_RENDER_PROFILE):
     """Generate a bar plot showing rabbit and wolf populations over time."""
     print(f'[INFO] Generating population trend plot in {outdir}')
     os.makedirs(outdir, exist_ok=True)
@@ -67,14 +92,12 @@ def plot_population_trends(results, outdir):
     plt.tight_layout()
     
     # Save the figure
-    fname = os.path.join(outdir, "total_population.png")
-    plt.savefig(fname, dpi=300, bbox_inches='tight')
-    plt.close()  # Important: close the figure to free memory
+    fname = save_figure(outdir, "total_population", profile)
     print(f'[INFO] Saved plot: {fname}')
     return fname
 
-def plot_rabbit_wolf_ratio_pie(results, outdir):
-    """Generate pie charts showing the ratio of rabbits to wolves."""
+def plot_rabbit_wolf_ratio_pie(results, outdir, charts=PIE_CHARTS, profile=DEFAULT_RENDER_PROFILE):
+    """Generate pie charts showing the ratio of rabbits to wolves; ``charts`` picks which of ``PIE_CHARTS`` to draw."""
     print(f'[INFO] Generating rabbit-wolf ratio pie charts in {outdir}')
     os.makedirs(outdir, exist_ok=True)
 
@@ -88,14 +111,14 @@ def plot_rabbit_wolf_ratio_pie(results, outdir):
     avg_rabbits = max(1, int(np.mean(rabbits)))
     avg_wolves = max(1, int(np.mean(wolves)))
 
-    chart_data = [
-        (start_rabbits, start_wolves, 'Start of Simulation', 'rabbit_wolf_ratio_start.png'),
-        (end_rabbits, end_wolves, 'End of Simulation', 'rabbit_wolf_ratio_end.png'),
-        (avg_rabbits, avg_wolves, 'Average Over Simulation', 'rabbit_wolf_ratio_avg.png'),
-    ]
+    chart_data = {
+        'start': (start_rabbits, start_wolves, 'Start of Simulation', 'rabbit_wolf_ratio_start'),
+        'end': (end_rabbits, end_wolves, 'End of Simulation', 'rabbit_wolf_ratio_end'),
+        'avg': (avg_rabbits, avg_wolves, 'Average Over Simulation', 'rabbit_wolf_ratio_avg'),
+    }
 
     pie_paths = []
-    for rabbits, wolves, title, fname in chart_data:
+    for rabbits, wolves, title, fname in (chart_data[chart] for chart in charts):
         # Create a separate figure for each pie chart
         plt.figure(figsize=(8, 8))
         
@@ -126,15 +149,13 @@ def plot_rabbit_wolf_ratio_pie(results, outdir):
         fig.gca().add_artist(centre_circle)
 
         plt.tight_layout()
-        outpath = os.path.join(outdir, fname)
-        plt.savefig(outpath, dpi=300, bbox_inches='tight')
-        plt.close()  # Important: close the figure
+        outpath = save_figure(outdir, fname, profile)
         print(f'[INFO] Saved pie chart: {outpath}')
         pie_paths.append(outpath)
 
     return tuple(pie_paths)
 
-def plot_grid_visualization(results, outdir):
+def plot_grid_visualization(results, outdir, profile=DEFAULT_RENDER_PROFILE):
     """Generate a grid visualization of the ecosystem."""
     print(f'[INFO] Generating grid visualization in {outdir}')
     os.makedirs(outdir, exist_ok=True)
@@ -156,8 +177,8 @@ def plot_grid_visualization(results, outdir):
             
         # Place wolves (less common)
         wolf_count = min(results['total_wolves_by_year'][-1], rows*cols*0.3)
-        remaining_positions = [i for i in range(rows*cols) if i not in rabbit_positions]
-        if remaining_positions and wolf_count > 0:
+        remaining_positions = np.setdiff1d(np.arange(rows*cols), rabbit_positions)
+        if remaining_positions.size and wolf_count > 0:
             wolf_positions = np.random.choice(remaining_positions, int(min(wolf_count, len(remaining_positions))), replace=False)
             for pos in wolf_positions:
                 grid[pos // cols, pos % cols] = 2
@@ -187,27 +208,27 @@ def plot_grid_visualization(results, outdir):
               f'Rabbits: {rabbit_cells} cells | Wolves: {wolf_cells} cells | Empty: {empty_cells} cells', 
               fontsize=14, fontweight='bold', pad=15)
     
-    # Add row and column numbers
-    plt.xticks(np.arange(grid.shape[1]))
-    plt.yticks(np.arange(grid.shape[0]))
-    
-    # Rotate the tick labels and set their alignment
-    plt.setp(plt.gca().get_xticklabels(), rotation=0, ha="center", rotation_mode="anchor")
-    
-    # Loop over data dimensions and create text annotations
-    for i in range(grid.shape[0]):
-        for j in range(grid.shape[1]):
-            text = plt.text(j, i, 'R' if grid[i, j] == 1 else 'W' if grid[i, j] == 2 else '',
-                           ha="center", va="center", color="black", fontsize=8, fontweight='bold')
+    # Per-cell ticks and labels are only legible (and affordable) on small grids
+    if max(grid.shape) <= MAX_ANNOTATED_GRID:
+        # Add row and column numbers
+        plt.xticks(np.arange(grid.shape[1]))
+        plt.yticks(np.arange(grid.shape[0]))
+        
+        # Rotate the tick labels and set their alignment
+        plt.setp(plt.gca().get_xticklabels(), rotation=0, ha="center", rotation_mode="anchor")
+        
+        # Loop over data dimensions and create text annotations
+        for i in range(grid.shape[0]):
+            for j in range(grid.shape[1]):
+                text = plt.text(j, i, 'R' if grid[i, j] == 1 else 'W' if grid[i, j] == 2 else '',
+                               ha="center", va="center", color="black", fontsize=8, fontweight='bold')
     
     plt.tight_layout()
-    fname = os.path.join(outdir, "grid_visualization.png")
-    plt.savefig(fname, dpi=300, bbox_inches='tight')
-    plt.close()
+    fname = save_figure(outdir, "grid_visualization", profile)
     print(f'[INFO] Saved grid visualization: {fname}')
     return fname
 
-def plot_phase_space(results, outdir):
+def plot_phase_space(results, outdir, profile=DEFAULT_RENDER_PROFILE):
     """Generate a phase space plot showing the relationship between rabbit and wolf populations."""
     print(f'[INFO] Generating phase space plot in {outdir}')
     os.makedirs(outdir, exist_ok=True)
@@ -268,13 +289,11 @@ def plot_phase_space(results, outdir):
                 fontsize=10)
     
     plt.tight_layout()
-    fname = os.path.join(outdir, "phase_space.png")
-    plt.savefig(fname, dpi=300, bbox_inches='tight')
-    plt.close()
+    fname = save_figure(outdir, "phase_space", profile)
     print(f'[INFO] Saved phase space plot: {fname}')
     return fname
 
-def plot_population_ratio(results, outdir):
+def plot_population_ratio(results, outdir, profile=DEFAULT_RENDER_PROFILE):
     """Generate a plot showing the ratio of rabbits to wolves over time."""
     print(f'[INFO] Generating population ratio plot in {outdir}')
     os.makedirs(outdir, exist_ok=True)
@@ -338,8 +357,6 @@ def plot_population_ratio(results, outdir):
     plt.legend(handles=handles, labels=labels, loc='upper right', fontsize=10)
     
     plt.tight_layout()
-    fname = os.path.join(outdir, "population_ratio.png")
-    plt.savefig(fname, dpi=300, bbox_inches='tight')
-    plt.close()
+    fname = save_figure(outdir, "population_ratio", profile)
     print(f'[INFO] Saved population ratio plot: {fname}')
     return fname
\ No newline at end of file
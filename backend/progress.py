@@ -0,0 +1,115 @@
+import os
+import time
+import numpy as np
+
+PROGRESS_ENCODINGS = ('json', 'binary', 'msgpack')
+# Events sent once per simulated year; everything else passes straight through
+BATCHED_EVENTS = ('year_update', 'performance_update')
+# Events that carry their own year and go out without flushing the batch first
+UNORDERED_EVENTS = ('grid_frame',)
+DEFAULT_MAX_RATE = 10.0
+DEFAULT_MAX_BATCH = 500
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+class ProgressBatcher:
+    """Socket.IO emitter that coalesces per-year events into ``progress_frame`` events.
+
+    ``year_update`` and ``performance_update`` payloads are buffered and sent
+    as one frame at most ``max_rate`` times a second, or as soon as
+    ``max_batch`` years are waiting; a ``max_rate`` of 0 drops the time limit.
+    Any other event (bar ``grid_frame``) flushes the buffer first, so
+    ordering is kept, and ``close`` sends what is left as the ``final``
+    frame. A frame holds, per batched event, one column per numeric field
+    (``year``, ``rabbits``, ...) plus the ``latest`` value of the others
+    (``phases``, ``workers``), and ``year`` is the last year the frame
+    covers. Columns are JSON lists, little-endian float64 buffers
+    (``binary``) or, with ``msgpack``, the whole group is packed into one
+    ``data`` buffer.
+    """
+
+    def __init__(self, socketio, max_rate=DEFAULT_MAX_RATE, max_batch=DEFAULT_MAX_BATCH, encoding='json'):
+        if encoding not in PROGRESS_ENCODINGS:
+            raise ValueError(f"Unknown progress encoding '{encoding}', expected one of: {', '.join(PROGRESS_ENCODINGS)}")
+        if max_rate < 0 or max_batch < 1:
+            raise ValueError("progress_rate must be >= 0 and progress_batch >= 1")
+        if encoding == 'msgpack' and _msgpack() is None:
+            print("[WARNING] msgpack is not installed; sending binary progress frames instead")
+            encoding = 'binary'
+        self.socketio = socketio
+        self.interval = 1.0 / max_rate if max_rate else None
+        self.max_batch = max_batch
+        self.encoding = encoding
+        self.frames = 0
+        self.events = 0
+        self._pending = {event: [] for event in BATCHED_EVENTS}
+        self._last_flush = time.monotonic()
+
+    @classmethod
+    def from_options(cls, socketio, options):
+        """Build from the ``progress_*`` keys of a start payload, defaulting to the ``SIM_PROGRESS_*`` settings."""
+        return cls(
+            socketio,
+            max_rate=float(options.get('progress_rate', os.environ.get('SIM_PROGRESS_RATE', DEFAULT_MAX_RATE))),
+            max_batch=int(options.get('progress_batch', os.environ.get('SIM_PROGRESS_BATCH', DEFAULT_MAX_BATCH))),
+            encoding=str(options.get('progress_encoding', os.environ.get('SIM_PROGRESS_ENCODING', 'json')))
+        )
+
+    def emit(self, event, data=None):
+        if event not in self._pending:
+            if event not in UNORDERED_EVENTS:
+                self.flush()
+            self.socketio.emit(event, data)
+            return
+        pending = self._pending[event]
+        pending.append(data)
+        self.events += 1
+        if len(pending) >= self.max_batch or (
+                self.interval is not None and time.monotonic() - self._last_flush >= self.interval):
+            self.flush()
+
+    def flush(self, final=False):
+        """Send the buffered years as one frame (nothing is sent for an empty buffer unless ``final``)."""
+        count = max(len(pending) for pending in self._pending.values())
+        if not count and not final:
+            return
+        frame = {"seq": self.frames, "final": final, "count": count, "encoding": self.encoding}
+        for event, pending in self._pending.items():
+            if pending:
+                frame["year"] = max(frame.get("year", pending[-1]["year"]), pending[-1]["year"])
+                frame[event] = self._encode(self._columns(pending))
+                pending.clear()
+        self.frames += 1
+        self._last_flush = time.monotonic()
+        self.socketio.emit('progress_frame', frame)
+
+    def close(self):
+        self.flush(final=True)
+        if self.events:
+            print(f'[INFO] Sent {self.events} progress events in {self.frames} frames')
+
+    @staticmethod
+    def _columns(payloads):
+        columns = {}
+        latest = {}
+        for key, value in payloads[-1].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and all(key in p for p in payloads):
+                columns[key] = [p[key] for p in payloads]
+            else:
+                latest[key] = value
+        if latest:
+            columns["latest"] = latest
+        return columns
+
+    def _encode(self, columns):
+        if self.encoding == 'json':
+            return columns
+        if self.encoding == 'msgpack':
+            return {"data": _msgpack().packb(columns)}
+        return {key: value if key == "latest" else np.asarray(value, dtype='<f8').tobytes()
+                for key, value in columns.items()}
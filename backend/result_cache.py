@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import inspect
+import threading
+from .history import legacy_results
+from .simulation import ENGINE_VERSION, run_simulation
+from .plotting import DEFAULT_RENDER_PROFILE
+
+CACHE_DIR = os.environ.get('SIM_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache'))
+DEFAULT_CACHE_MB = 2048
+# Settings that change where or how fast a run goes, never its numbers
+NON_RESULT_PARAMS = ('socketio', 'pool', 'backend', 'workers', 'memory_budget_mb', 'history_path', 'checkpoint_path',
+                     'checkpoint_every_years', 'checkpoint_every_seconds', 'resume', 'instrument', 'cancel_event',
+                     'grid_stream')
+
+def cache_key(params, profile=DEFAULT_RENDER_PROFILE):
+    """Hash of the engine version and every result-relevant setting of a run, or None if it is not repeatable.
+
+    Unset settings take ``run_simulation``'s defaults, so spelling a default
+    out does not change the key. Stochastic and agent runs are only
+    repeatable with an explicit ``seed``. The report's render ``profile``
+    is part of the key because the entry holds the rendered report.
+    """
+    settings = {
+        name: parameter.default for name, parameter in inspect.signature(run_simulation).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+    settings.update(params)
+    if (settings['stochastic'] or settings['engine'] == 'agents') and settings['seed'] is None:
+        return None
+    for name in NON_RESULT_PARAMS:
+        settings.pop(name, None)
+    canonical = json.dumps({"engine_version": ENGINE_VERSION, "params": settings, "render_profile": profile},
+                           sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ResultCache:
+    """Finished runs on disk by ``cache_key``: results, AI summary, plots and PDF report.
+
+    ``<root>/<key>/`` holds ``results.json`` (the JSON-safe results without
+    the per-cell history), ``summary.txt``, ``report.pdf`` and ``plots/``.
+    The cache keeps at most ``max_mb`` megabytes and evicts the least
+    recently used entries first; a ``max_mb`` of 0 turns it off.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_mb=DEFAULT_CACHE_MB):
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = self._scan()
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_mb=float(os.environ.get('SIM_CACHE_MAX_MB', DEFAULT_CACHE_MB)))
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _dir(self, key):
+        if not key or not str(key).isalnum():
+            raise KeyError(f"Invalid cache key '{key}'")
+        return os.path.join(self.root, str(key))
+
+    def _scan(self):
+        """Entries already on disk, with their size and last use (the mtime of ``entry.json``)."""
+        entries = {}
+        if not os.path.isdir(self.root):
+            return entries
+        for key in os.listdir(self.root):
+            marker = os.path.join(self.root, key, 'entry.json')
+            if not key.isalnum() or not os.path.exists(marker):
+                # Left behind by an interrupted put
+                shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+                continue
+            entries[key] = {"bytes": _tree_bytes(os.path.join(self.root, key)), "used": os.path.getmtime(marker)}
+        return entries
+
+    def get(self, key):
+        """The cached entry for ``key`` (``entry.json`` plus ``results`` and ``summary``), or None; a hit counts as a use."""
+        if not self.enabled or key is None:
+            return None
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            directory = self._dir(key)
+            marker = os.path.join(directory, 'entry.json')
+            try:
+                with open(marker) as f:
+                    entry = json.load(f)
+                with open(os.path.join(directory, 'results.json')) as f:
+                    entry['results'] = json.load(f)
+                with open(os.path.join(directory, 'summary.txt')) as f:
+                    entry['summary'] = f.read()
+            except (OSError, ValueError) as e:
+                print(f'[WARNING] Dropping unreadable cache entry {key}: {str(e)}')
+                self._remove(key)
+                self.misses += 1
+                return None
+            now = time.time()
+            os.utime(marker, (now, now))
+            self._entries[key]['used'] = now
+            self.hits += 1
+        return entry
+
+    def report_path(self, key):
+        path = os.path.join(self._dir(key), 'report.pdf')
+        if key not in self._entries or not os.path.exists(path):
+            raise KeyError(f"No cached report '{key}'")
+        return path
+
+    def put(self, key, run_id, results, summary, report_dir):
+        """Store a finished run and the report written to ``report_dir``, then evict down to the size cap."""
+        if not self.enabled or key is None:
+            return None
+        directory = self._dir(key)
+        staging = f"{directory}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(report_dir, staging)
+        meta = legacy_results(results)
+        del meta['yearly_results']
+        with open(os.path.join(staging, 'results.json'), 'w') as f:
+            json.dump(meta, f)
+        with open(os.path.join(staging, 'summary.txt'), 'w') as f:
+            f.write(summary)
+        with open(os.path.join(staging, 'entry.json'), 'w') as f:
+            json.dump({"key": key, "runId": run_id, "created": time.time()}, f)
+        size = _tree_bytes(staging)
+        with self._lock:
+            if size > self.max_bytes:
+                shutil.rmtree(staging, ignore_errors=True)
+                print(f'[WARNING] Run {run_id} ({size} bytes) is larger than the whole result cache; not cached')
+                return None
+            self._remove(key)
+            os.replace(staging, directory)
+            self._entries[key] = {"bytes": size, "used": time.time()}
+            self._evict()
+        print(f'[INFO] Cached run {run_id} as {key[:12]} ({size / 1024 / 1024:.1f} MB)')
+        return key
+
+    def _remove(self, key):
+        shutil.rmtree(self._dir(key), ignore_errors=True)
+        self._entries.pop(key, None)
+
+    def _evict(self):
+        total = sum(entry['bytes'] for entry in self._entries.values())
+        for key in sorted(self._entries, key=lambda key: self._entries[key]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries[key]['bytes']
+            self._remove(key)
+            print(f'[INFO] Evicted cached run {key[:12]}')
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(entry['bytes'] for entry in self._entries.values()),
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+def _tree_bytes(path):
+    return sum(os.path.getsize(os.path.join(folder, name)) for folder, _, names in os.walk(path) for name in names)
@@ -0,0 +1,63 @@
+import json
+import threading
+from collections import OrderedDict
+
+# Rooms whose counters are kept individually; older ones are folded into the totals only
+MAX_TRACKED_ROOMS = 1024
+
+def job_room(job_id):
+    """Room of everyone following a job: its submitter plus anyone who sent ``join_job``."""
+    return f"job:{job_id}"
+
+def payload_bytes(data):
+    """Approximate wire size of an event payload: JSON text plus raw binary attachments."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    if isinstance(data, dict):
+        return 2 + sum(payload_bytes(key) + payload_bytes(value) + 2 for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return 2 + sum(payload_bytes(value) + 1 for value in data)
+    return len(json.dumps(data, default=str))
+
+class RoomEmitter:
+    """Socket.IO-style ``emit(event, data)`` bound to one room."""
+
+    def __init__(self, metrics, room):
+        self.metrics = metrics
+        self.room = room
+
+    def emit(self, event, data=None):
+        self.metrics.emit(event, data, self.room)
+
+class RoomMetrics:
+    """Sends events to a single room and counts messages and bytes per room and event."""
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.totals = {"messages": 0, "bytes": 0}
+        self._rooms = OrderedDict()
+        self._lock = threading.Lock()
+
+    def to(self, room):
+        return RoomEmitter(self, room)
+
+    def emit(self, event, data, room):
+        size = payload_bytes(data)
+        with self._lock:
+            counts = self._rooms.pop(room, None) or {"messages": 0, "bytes": 0, "events": {}}
+            counts["messages"] += 1
+            counts["bytes"] += size
+            counts["events"][event] = counts["events"].get(event, 0) + 1
+            self._rooms[room] = counts
+            while len(self._rooms) > MAX_TRACKED_ROOMS:
+                self._rooms.popitem(last=False)
+            self.totals["messages"] += 1
+            self.totals["bytes"] += size
+        self.socketio.emit(event, data, to=room)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "totals": dict(self.totals),
+                "rooms": {room: dict(counts, events=dict(counts["events"])) for room, counts in self._rooms.items()}
+            }
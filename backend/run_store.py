@@ -0,0 +1,121 @@
+import io
+import os
+import json
+import shutil
+import numpy as np
+from .history import GridHistory, legacy_results, public_params
+
+RUNS_DIR = os.environ.get('SIM_RUNS_DIR', os.path.join(os.path.dirname(__file__), 'runs'))
+DEFAULT_MAX_RUNS = 100
+
+def prune_oldest(root, keep, protect=()):
+    """Delete the least recently modified directories of ``root`` beyond the newest ``keep``, except ``protect``.
+
+    Returns the removed names; a ``keep`` of 0 keeps everything.
+    """
+    if not keep or not os.path.isdir(root):
+        return []
+    names = [name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))]
+    kept = sum(name in protect for name in names)
+    names = sorted((name for name in names if name not in protect),
+                   key=lambda name: os.path.getmtime(os.path.join(root, name)), reverse=True)
+    removed = names[max(0, keep - kept):]
+    for name in removed:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return removed
+
+class RunStore:
+    """Completed runs on disk, one directory per run.
+
+    ``<root>/<run_id>/history.npy`` holds the per-cell history as a
+    memory-mapped (years, rows, cols, 2) array and ``meta.json`` the
+    JSON-safe results. Queries map the file and slice it, so serving a year
+    or a cell never loads the whole run. At most ``max_runs`` runs are
+    kept; ``prune`` removes the oldest ones beyond that.
+    """
+
+    def __init__(self, root=RUNS_DIR, max_runs=DEFAULT_MAX_RUNS):
+        self.root = root
+        self.max_runs = max_runs
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_runs=int(os.environ.get('SIM_MAX_STORED_RUNS', DEFAULT_MAX_RUNS)))
+
+    def _dir(self, run_id):
+        if not run_id or not str(run_id).isalnum():
+            raise KeyError(f"Invalid run id '{run_id}'")
+        return os.path.join(self.root, str(run_id))
+
+    def history_path(self, run_id):
+        return os.path.join(self._dir(run_id), 'history.npy')
+
+    def save(self, run_id, results):
+        """Write ``meta.json`` for a finished run whose history was recorded to ``history_path``."""
+        meta = legacy_results(results)
+        del meta['yearly_results']
+        history = results.get('history')
+        meta['history'] = {
+            "stored": history is not None and history.path is not None,
+            "dtype": str(history.dtype) if history is not None else None
+        }
+        path = os.path.join(self._dir(run_id), 'meta.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(f"{path}.tmp", path)
+        return meta
+
+    def meta(self, run_id):
+        path = os.path.join(self._dir(run_id), 'meta.json')
+        if not os.path.exists(path):
+            raise KeyError(f"Unknown run '{run_id}'")
+        with open(path) as f:
+            meta = json.load(f)
+        # Runs stored before paths were stripped on save
+        meta['params'] = public_params(meta.get('params', {}))
+        return meta
+
+    def history(self, run_id):
+        """The run's history as a read-only memory-mapped GridHistory."""
+        meta = self.meta(run_id)
+        if not meta['history']['stored']:
+            raise KeyError(f"Run '{run_id}' has no stored cell history")
+        return GridHistory.load(self.history_path(run_id), meta['start_year'])
+
+    def prune(self, protect=()):
+        """Remove the oldest stored runs beyond ``max_runs``, never those in ``protect``; returns their ids."""
+        removed = prune_oldest(self.root, self.max_runs, protect)
+        if removed:
+            print(f'[INFO] Pruned {len(removed)} stored runs')
+        return removed
+
+    def runs(self):
+        """Summaries of every stored run."""
+        runs = []
+        if not os.path.isdir(self.root):
+            return runs
+        for run_id in sorted(os.listdir(self.root)):
+            try:
+                meta = self.meta(run_id)
+            except (KeyError, ValueError):
+                continue
+            runs.append({
+                "runId": run_id,
+                "rows": meta['rows'],
+                "cols": meta['cols'],
+                "startYear": meta['start_year'],
+                "endYear": meta['end_year'],
+                "history": meta['history'],
+                "termination": meta.get('termination')
+            })
+        return runs
+
+def npy_chunks(array):
+    """Stream ``array`` as ``.npy`` bytes one leading-axis slice at a time, so large ranges stay off the heap."""
+    header = dict(np.lib.format.header_data_from_array_1_0(array), fortran_order=False)
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, header)
+    yield buffer.getvalue()
+    for block in array:
+        yield np.ascontiguousarray(block).tobytes()
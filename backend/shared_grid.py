@@ -0,0 +1,131 @@
+import os
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+_attached = {}
+
+def _open_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no ``track`` flag. The parent owns the block, so keep the
+        # worker from registering it: a tracker the worker started itself would
+        # unlink it (and warn) at exit, and unregistering afterwards would drop the
+        # parent's entry when both share one tracker. Pool workers run one task at
+        # a time, so swapping the hook out briefly is safe.
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+def _attach(name, shape):
+    """Map the parent's double buffer into this worker, reusing the mapping across years."""
+    entry = _attached.get(name)
+    if entry is None:
+        for stale_name in list(_attached):
+            stale_shm, stale_buffers = _attached.pop(stale_name)
+            del stale_buffers
+            stale_shm.close()
+        shm = _open_shared_memory(name)
+        entry = (shm, np.ndarray((2,) + tuple(shape), dtype=np.float64, buffer=shm.buf))
+        _attached[name] = entry
+    return entry[1]
+
+def _halo_rows(rows, row_start, row_stop, halo, periodic):
+    """Rows a tile must read so ``halo`` stencil applications cannot reach its interior from a cut edge."""
+    if periodic:
+        return np.arange(row_start - halo, row_stop + halo) % rows, halo
+    low = max(0, row_start - halo)
+    return slice(low, min(rows, row_stop + halo)), row_start - low
+
+def step_rows(source, target, row_start, row_stop, step, params, halo=0, periodic=False, with_rows=False):
+    """Advance rows ``[row_start, row_stop)`` of ``source`` by one year into ``target``.
+
+    With a ``halo`` the rows are stepped together with ``halo`` neighbouring
+    rows on each side, read straight from ``source``; that is the halo
+    exchange. Only the tile's own rows are written. With ``with_rows`` the
+    step also gets the tile's absolute ``row_start``.
+    """
+    if not halo:
+        extra = {"row_start": row_start} if with_rows else {}
+        return step(source[row_start:row_stop], target[row_start:row_stop], *params, **extra)
+    rows, offset = _halo_rows(source.shape[0], row_start, row_stop, halo, periodic)
+    block = source[rows]
+    stepped = np.empty_like(block)
+    stats = step(block, stepped, *params)
+    target[row_start:row_stop] = stepped[offset:offset + row_stop - row_start]
+    return stats
+
+def advance_tile(task):
+    """Worker side of ``SharedGrid.advance``: ``step_rows`` on the shared double buffer.
+
+    Returns ``(seconds, stats, pid)`` so the parent can see each worker's compute time.
+    """
+    name, shape, src, row_start, row_stop, step, params, halo, periodic, with_rows = task
+    started = time.perf_counter()
+    buffers = _attach(name, shape)
+    stats = step_rows(buffers[src], buffers[1 - src], row_start, row_stop, step, params, halo, periodic, with_rows)
+    return time.perf_counter() - started, stats, os.getpid()
+
+def make_tiles(rows, workers, align=1):
+    """Split ``rows`` into at most ``2 * workers`` contiguous row ranges of near-equal size.
+
+    Tile boundaries fall on multiples of ``align`` rows.
+    """
+    blocks = -(-rows // align)
+    count = max(1, min(blocks, workers * 2))
+    bounds = np.minimum(np.linspace(0, blocks, count + 1).astype(int) * align, rows)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+class SharedGrid:
+    """A (rows, cols, 2) grid double-buffered in one ``multiprocessing.shared_memory`` block.
+
+    Workers only ever receive the block name and their tile's row range; the
+    parent swaps ``current`` after each year instead of copying any data.
+    """
+
+    def __init__(self, grid):
+        self.shape = grid.shape
+        self._shm = shared_memory.SharedMemory(create=True, size=2 * grid.nbytes)
+        self.buffers = np.ndarray((2,) + self.shape, dtype=np.float64, buffer=self._shm.buf)
+        self.buffers[0] = grid
+        self.buffers[1] = 0
+        self.current = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def grid(self):
+        return self.buffers[self.current]
+
+    def advance(self, pool, tiles, step, params, halo=0, periodic=False, with_rows=False):
+        """Run ``step(src_tile, dst_tile, *params)`` on every tile in ``pool``, then swap buffers.
+
+        ``halo`` is the number of extra rows each tile reads on either side
+        (wrapping around when ``periodic``). Returns one
+        ``(seconds, step_result, worker_pid)`` tuple per tile.
+        """
+        tasks = [
+            (self.name, self.shape, self.current, start, stop, step, params, halo, periodic, with_rows)
+            for start, stop in tiles
+        ]
+        tile_results = pool.map(advance_tile, tasks)
+        self.current = 1 - self.current
+        return tile_results
+
+    def release(self):
+        """Copy out the current grid and free the shared block."""
+        final = np.array(self.grid)
+        del self.buffers
+        self._shm.unlink()
+        try:
+            self._shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with it
+            pass
+        return final
@@ -1,131 +1,498 @@
 import os
+import threading
 import numpy as np
-import multiprocessing
 import time
 import psutil
-from .utils import determine_grid_size
+from .utils import HISTORY_AUTO_BYTES, check_disk_space, check_memory_budget, determine_grid_size, estimate_memory
+from .history import HISTORY_DTYPES, GridHistory
+from .worker_pool import WorkerPool
+from .shared_grid import SharedGrid, make_tiles, step_rows
+from .backends import BACKENDS, ThreadBackend, select_backend
+from .instrumentation import make_timer, worker_usage
+from .integrators import INTEGRATORS, integrate, lotka_volterra_rhs, merge_stats
+from .active_cells import ActiveCells
+from .convergence import ConvergenceMonitor
+from .checkpoint import CheckpointPolicy, load_checkpoint
+from .spatial import BOUNDARIES, migration_enabled, stencil_applications, with_migration
+from .stochastic import new_seed, stream_block_rows, tau_leap_grid_step
+from .agents import AGENT_BYTES, DEFAULT_MAX_AGENTS, AgentPopulation, advance_agents
 
-def lotka_volterra_step(rabbits, wolves, alpha, beta, gamma, delta, dt=0.1):
-    steps = 10
+def lotka_volterra_step(rabbits, wolves, alpha, beta, gamma, delta, dt=0.1, method='euler', rtol=1e-6, atol=1e-6,
+                        with_stats=False):
+    """Advance one cell by one year; with ``with_stats`` also return the integrator statistics."""
+    if method != 'euler':
+        state, stats = integrate(
+            np.array([[rabbits, wolves]], dtype=float),
+            lotka_volterra_rhs(alpha, beta, gamma, delta),
+            method=method, dt=dt, rtol=rtol, atol=atol
+        )
+        next_rabbits, next_wolves = float(state[0, 0]), float(state[0, 1])
+        return (next_rabbits, next_wolves, stats) if with_stats else (next_rabbits, next_wolves)
+    # Same step count and length as the grid kernel, so both engines agree for any dt
+    steps = max(1, int(round(1.0 / dt)))
+    h = 1.0 / steps
     current_rabbits = rabbits
     current_wolves = wolves
     for _ in range(steps):
-        rabbit_change = (alpha * current_rabbits - beta * current_rabbits * current_wolves) * dt
-        wolf_change = (delta * current_rabbits * current_wolves - gamma * current_wolves) * dt
+        rabbit_change = (alpha * current_rabbits - beta * current_rabbits * current_wolves) * h
+        wolf_change = (delta * current_rabbits * current_wolves - gamma * current_wolves) * h
         current_rabbits += rabbit_change
         current_wolves += wolf_change
         current_rabbits = max(0, current_rabbits)
         current_wolves = max(0, current_wolves)
+    if with_stats:
+        stats = {"method": method, "steps": steps, "rejected_steps": 0,
+                 "function_evaluations": steps, "max_cell_steps": steps}
+        return current_rabbits, current_wolves, stats
     return current_rabbits, current_wolves
 
+def lotka_volterra_grid_step(grid, out, alpha, beta, gamma, delta, dt=0.1, steps=10):
+    """Advance every cell of a (rows, cols, 2) grid by one year, writing into ``out``.
+
+    Mirrors ``lotka_volterra_step`` operation for operation so both engines
+    produce the same numbers, but works on whole arrays with preallocated
+    scratch buffers instead of one Python call per cell.
+    """
+    np.copyto(out, grid)
+    current_rabbits = out[..., 0]
+    current_wolves = out[..., 1]
+    rabbit_change = np.empty(current_rabbits.shape)
+    wolf_change = np.empty(current_rabbits.shape)
+    scratch = np.empty(current_rabbits.shape)
+    for _ in range(steps):
+        np.multiply(alpha, current_rabbits, out=rabbit_change)
+        np.multiply(beta, current_rabbits, out=scratch)
+        scratch *= current_wolves
+        rabbit_change -= scratch
+        rabbit_change *= dt
+        np.multiply(delta, current_rabbits, out=wolf_change)
+        wolf_change *= current_wolves
+        np.multiply(gamma, current_wolves, out=scratch)
+        wolf_change -= scratch
+        wolf_change *= dt
+        current_rabbits += rabbit_change
+        current_wolves += wolf_change
+        np.maximum(current_rabbits, 0, out=current_rabbits)
+        np.maximum(current_wolves, 0, out=current_wolves)
+    return out
+
+def advance_grid(grid, out, alpha, beta, gamma, delta, integrator=None, migration=None):
+    """Advance ``grid`` by one year into ``out`` with the configured integrator.
+
+    ``integrator`` holds ``method`` plus ``dt``/``rtol``/``atol``; ``migration``
+    (see ``spatial.with_migration``) adds dispersal between neighbouring cells
+    to every substep. Uncoupled forward Euler goes through the preallocated
+    ``lotka_volterra_grid_step`` kernel. Returns the integrator statistics for
+    the year.
+    """
+    options = integrator or {}
+    method = options.get('method', 'euler')
+    dt = options.get('dt', 0.1)
+    rhs = lotka_volterra_rhs(alpha, beta, gamma, delta)
+    coupled = migration_enabled(migration)
+    if coupled:
+        rhs = with_migration(rhs, migration)
+    elif method == 'euler':
+        steps = max(1, int(round(1.0 / dt)))
+        lotka_volterra_grid_step(grid, out, alpha, beta, gamma, delta, dt=1.0 / steps, steps=steps)
+        cells = grid.size // 2
+        return {"method": method, "steps": steps * cells, "rejected_steps": 0,
+                "function_evaluations": steps * cells, "max_cell_steps": steps}
+    state, stats = integrate(
+        grid, rhs, method=method, dt=dt, per_cell=not coupled,
+        rtol=options.get('rtol', 1e-6), atol=options.get('atol', 1e-6)
+    )
+    np.copyto(out, state)
+    return stats
+
 def process_grid_cell(args):
-    r, c, rabbits, wolves, alpha, beta, gamma, delta = args
+    r, c, rabbits, wolves, alpha, beta, gamma, delta, *options = args
+    integrator = options[0] if options else {}
     if rabbits > 0 or wolves > 0:
-        next_rabbits, next_wolves = lotka_volterra_step(
-            rabbits, wolves, alpha, beta, gamma, delta
+        next_rabbits, next_wolves, stats = lotka_volterra_step(
+            rabbits, wolves, alpha, beta, gamma, delta, with_stats=True, **integrator
         )
-        return r, c, next_rabbits, next_wolves
-    return r, c, 0, 0
+        return r, c, next_rabbits, next_wolves, stats
+    return r, c, 0, 0, {}
+
 
+ENGINES = ('vectorized', 'shared', 'pool', 'agents')
+# Bump whenever a change alters the numbers a run produces; cached results of older versions are then ignored
+ENGINE_VERSION = 2
+# Engines tied to one backend; 'shared' is the vectorized engine on worker processes
+ENGINE_BACKENDS = {"shared": "process", "pool": "process", "agents": "serial"}
 
-def run_simulation(start_year, end_year, rabbits, wolves, alpha, beta, gamma, delta, socketio=None):
+def _advance_with_pool(pool, grid, next_grid, alpha, beta, gamma, delta, integrator, active):
+    cols = grid.shape[1]
+    args_list = []
+    for cell in active.index.tolist():
+        r, c = divmod(cell, cols)
+        args_list.append((r, c, grid[r, c, 0], grid[r, c, 1], alpha, beta, gamma, delta, integrator))
+    results = pool.map(process_grid_cell, args_list)
+    year_stats = {}
+    for r, c, next_rabbits, next_wolves, stats in results:
+        next_grid[r, c, 0] = next_rabbits
+        next_grid[r, c, 1] = next_wolves
+        year_stats = merge_stats(year_stats, stats)
+    return year_stats
+
+def _advance_active(grid, next_grid, active, alpha, beta, gamma, delta, integrator, migration):
+    """Step only the live part of the grid: gathered live cells, or the live row band with migration."""
+    if active.reach != 0:
+        low, high = active.band
+        if high <= low:
+            return {}
+        return advance_grid(grid[low:high], next_grid[low:high], alpha, beta, gamma, delta, integrator, migration)
+    if not active.sparse:
+        return advance_grid(grid, next_grid, alpha, beta, gamma, delta, integrator, migration)
+    if not active.count:
+        return {}
+    live = grid.reshape(-1, 2)[active.index]
+    stepped = np.empty_like(live)
+    stats = advance_grid(live, stepped, alpha, beta, gamma, delta, integrator)
+    next_grid.reshape(-1, 2)[active.index] = stepped
+    return stats
+
+def run_simulation(start_year, end_year, rabbits, wolves, alpha, beta, gamma, delta, socketio=None, engine='vectorized', pool=None,
+                   backend='auto', workers=None, integrator='euler', dt=0.1, rtol=1e-6, atol=1e-6,
+                   rabbit_migration=0.0, wolf_migration=0.0, boundary='reflecting',
+                   rows=None, cols=None, density=None, cell_history=None, history_dtype='float32', history_path=None, memory_budget_mb=None,
+                   early_stop=False, cell_tol=1e-6, global_tol=1e-6, patience=3, extinction_threshold=0.0,
+                   stochastic=False, seed=None,
+                   agent_speed=1.0, agent_starvation=False, max_agents=DEFAULT_MAX_AGENTS,
+                   checkpoint_path=None, checkpoint_every_years=None, checkpoint_every_seconds=None, resume=None,
+                   instrument=True, cancel_event=None, grid_stream=None):
     start_time = time.time()
+    if (stochastic or engine == 'agents') and seed is None:
+        seed = new_seed()
+    run_params = {
+        "start_year": start_year, "end_year": end_year, "rabbits": rabbits, "wolves": wolves,
+        "alpha": alpha, "beta": beta, "gamma": gamma, "delta": delta, "engine": engine, "backend": backend,
+        "integrator": integrator, "dt": dt, "rtol": rtol, "atol": atol,
+        "rabbit_migration": rabbit_migration, "wolf_migration": wolf_migration, "boundary": boundary,
+        "cell_history": cell_history, "history_dtype": history_dtype, "history_path": history_path,
+        "memory_budget_mb": memory_budget_mb,
+        "early_stop": early_stop, "cell_tol": cell_tol, "global_tol": global_tol, "patience": patience,
+        "extinction_threshold": extinction_threshold,
+        "stochastic": stochastic, "seed": seed,
+        "agent_speed": agent_speed, "agent_starvation": agent_starvation, "max_agents": max_agents,
+        "instrument": instrument
+    }
     if alpha <= 0 or beta <= 0 or gamma <= 0 or delta <= 0:
         raise ValueError("All rate parameters (alpha, beta, gamma, delta) must be positive")
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of: {', '.join(ENGINES)}")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+    if engine in ENGINE_BACKENDS and backend not in ('auto', ENGINE_BACKENDS[engine]):
+        raise ValueError(f"The '{engine}' engine runs on the '{ENGINE_BACKENDS[engine]}' backend")
+    if integrator not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator '{integrator}', expected one of: {', '.join(INTEGRATORS)}")
+    if dt <= 0 or dt > 1 or rtol <= 0 or atol <= 0:
+        raise ValueError("dt must be in (0, 1] and tolerances (rtol, atol) must be positive")
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"Unknown boundary '{boundary}', expected one of: {', '.join(BOUNDARIES)}")
+    if rabbit_migration < 0 or wolf_migration < 0:
+        raise ValueError("Migration rates must not be negative")
+    if integrator != 'dopri5' and max(rabbit_migration, wolf_migration) * dt > 0.25:
+        raise ValueError("Migration rate * dt must not exceed 0.25 for fixed-step integrators (unstable)")
+    if history_dtype not in HISTORY_DTYPES:
+        raise ValueError(f"Unknown history dtype '{history_dtype}', expected one of: {', '.join(HISTORY_DTYPES)}")
+    integrator_options = {"method": integrator, "dt": dt, "rtol": rtol, "atol": atol}
+    migration = {"rabbit_rate": rabbit_migration, "wolf_rate": wolf_migration, "boundary": boundary}
+    if migration_enabled(migration) and engine == 'pool':
+        raise ValueError("Migration couples neighbouring cells and needs the 'vectorized' or 'shared' engine")
+    if stochastic and (engine == 'pool' or integrator != 'euler' or migration_enabled(migration)):
+        raise ValueError("Stochastic mode tau-leaps with the fixed dt on the 'vectorized' or 'shared' engine, without migration")
+    if engine == 'agents' and (stochastic or integrator != 'euler' or migration_enabled(migration)):
+        raise ValueError("The agent engine moves animals itself (agent_speed) and steps them with the fixed dt")
+    if extinction_threshold < 0 or (extinction_threshold and engine == 'agents'):
+        raise ValueError("extinction_threshold must not be negative, and the agent engine counts whole animals without one")
+    if (checkpoint_every_years is not None and checkpoint_every_years < 1) or (checkpoint_every_seconds is not None and checkpoint_every_seconds <= 0):
+        raise ValueError("checkpoint_every_years must be at least 1 and checkpoint_every_seconds must be positive")
+    if engine == 'agents' and (agent_speed < 0 or max_agents < 1):
+        raise ValueError("agent_speed must not be negative and max_agents must be positive")
+    halo = stencil_applications(integrator, dt) if migration_enabled(migration) else 0
     total_population = rabbits + wolves
-    rows, cols = determine_grid_size(total_population)
+    rows, cols = determine_grid_size(total_population, rows, cols, density)
+    run_params.update(rows=rows, cols=cols)
+    years = end_year - start_year + 1
+    if engine in ('pool', 'agents'):
+        backend, backend_reason = ENGINE_BACKENDS[engine], f'{engine} engine'
+    else:
+        # Adaptive steps with migration cannot be split into row tiles
+        backend, backend_reason = select_backend(
+            rows, cols, years, cores=workers, requested=ENGINE_BACKENDS.get(engine, backend), tileable=halo is not None
+        )
+        if engine == 'shared' and backend != 'process':
+            engine = 'vectorized'
+    print(f'[INFO] Using the {backend} backend ({backend_reason})')
+    history_bytes = rows * cols * years * GridHistory.bytes_per_cell_year(history_dtype)
+    if cell_history is None:
+        # Applies to disk history too: an unbounded default would fill the disk instead of RAM
+        cell_history = history_bytes <= HISTORY_AUTO_BYTES
+    # Agent arrays plus the temporaries of one substep
+    agent_bytes = 3 * AGENT_BYTES * max_agents if engine == 'agents' else 0
+    check_memory_budget(
+        estimate_memory(rows, cols, years, integrator, history_bytes if cell_history and not history_path else 0)
+        + agent_bytes,
+        memory_budget_mb
+    )
     grid = np.zeros((rows, cols, 2), dtype=float)
     grid[...,0] += rabbits // (rows*cols)
     grid[...,1] += wolves // (rows*cols)
     rabbits_left = rabbits % (rows*cols)
     wolves_left = wolves % (rows*cols)
-    for i in range(rabbits_left):
-        grid[i//cols, i%cols, 0] += 1
-    for i in range(wolves_left):
-        grid[i//cols, i%cols, 1] += 1
-    years = end_year - start_year + 1
-    yearly_results = []
+    flat = grid.reshape(rows*cols, 2)
+    flat[:rabbits_left, 0] += 1
+    flat[:wolves_left, 1] += 1
+    next_grid = np.zeros_like(grid)
+    population = None
+    if engine == 'agents':
+        placement = np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(0,))))
+        population = AgentPopulation(grid, agent_speed, boundary, agent_starvation, max_agents, rng=placement)
+    history = None
+    if cell_history and history_path is None:
+        history = GridHistory(start_year, years, rows, cols, history_dtype)
+    elif cell_history and resume is not None and os.path.exists(history_path):
+        history = GridHistory.load(history_path, start_year, recorded=0, mode='r+')
+    elif cell_history:
+        check_disk_space(history_path, history_bytes)
+        history = GridHistory.on_disk(history_path, start_year, years, rows, cols, history_dtype)
     total_rabbits_by_year = []
     total_wolves_by_year = []
     performance_data = []
     total_rabbits = int(np.sum(grid[..., 0]))
     total_wolves = int(np.sum(grid[..., 1]))
-    year_data = []
-    for r in range(rows):
-        for c in range(cols):
-            update = {
-                "year": start_year,
-                "grid": [r, c],
-                "rabbits": int(grid[r, c, 0]),
-                "wolves": int(grid[r, c, 1])
-            }
-            year_data.append(update)
-    yearly_results.append(year_data)
+    if history is not None:
+        history.record(0, grid)
     total_rabbits_by_year.append(total_rabbits)
     total_wolves_by_year.append(total_wolves)
+    integrator_stats = {}
+    compute_time = 0.0
+    quiet_years = 0
+    first_year_idx = 1
+    if resume is not None:
+        arrays, meta = resume
+        first_year_idx = meta['year_idx'] + 1
+        grid[...] = arrays['grid']
+        total_rabbits_by_year = arrays['total_rabbits_by_year'].tolist()
+        total_wolves_by_year = arrays['total_wolves_by_year'].tolist()
+        total_rabbits, total_wolves = total_rabbits_by_year[-1], total_wolves_by_year[-1]
+        performance_data = meta['performance_data']
+        integrator_stats = meta['integrator_stats']
+        compute_time = meta['compute_time']
+        quiet_years = meta['quiet_years']
+        if population is not None:
+            population.restore(arrays)
+        if history is not None:
+            if 'history' in arrays:
+                history.data[:first_year_idx] = arrays['history']
+            history.recorded = first_year_idx
+        print(f'[INFO] Resuming simulation after {start_year + meta["year_idx"]}')
     if socketio:
-        socketio.emit('year_update', {
-            "year": start_year, 
-            "rabbits": total_rabbits, 
-            "wolves": total_wolves
-        })
-    num_cores = multiprocessing.cpu_count()
-    pool = multiprocessing.Pool(processes=num_cores)
-    for year_idx in range(1, years):
-        year = start_year + year_idx
-        next_grid = np.zeros_like(grid)
-        year_start_time = time.time()
-        args_list = []
-        for r in range(rows):
-            for c in range(cols):
-                args_list.append((r, c, grid[r, c, 0], grid[r, c, 1], alpha, beta, gamma, delta))
-        results = pool.map(process_grid_cell, args_list)
-        for r, c, next_rabbits, next_wolves in results:
-            next_grid[r, c, 0] = next_rabbits
-            next_grid[r, c, 1] = next_wolves
-        grid = next_grid
-        year_data = []
-        total_rabbits = 0
-        total_wolves = 0
-        for r in range(rows):
-            for c in range(cols):
-                rabbits_now = grid[r, c, 0]
-                wolves_now = grid[r, c, 1]
-                total_rabbits += rabbits_now
-                total_wolves += wolves_now
-                update = {
-                    "year": year,
-                    "grid": [r, c],
-                    "rabbits": int(rabbits_now),
-                    "wolves": int(wolves_now)
-                }
-                year_data.append(update)
-        total_rabbits = int(total_rabbits)
-        total_wolves = int(total_wolves)
-        year_time = (time.time() - year_start_time) * 1000
-        memory_usage = psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024
-        performance_data.append({
-            "year": year,
-            "timePerYear": year_time,
-            "memoryUsage": memory_usage
-        })
-        if socketio:
+        for year_idx in range(first_year_idx):
             socketio.emit('year_update', {
-                "year": year, 
-                "rabbits": total_rabbits, 
-                "wolves": total_wolves
+                "year": start_year + year_idx, 
+                "rabbits": total_rabbits_by_year[year_idx], 
+                "wolves": total_wolves_by_year[year_idx]
             })
-            socketio.emit('performance_update', {
+    checkpoints = None
+    if checkpoint_path and (checkpoint_every_years is not None or checkpoint_every_seconds is not None):
+        checkpoints = CheckpointPolicy(checkpoint_path, checkpoint_every_years, checkpoint_every_seconds)
+        checkpoints.last_year_idx = first_year_idx - 1
+    owns_pool = False
+    shared = None
+    threads = None
+    num_cores = 1
+    try:
+        if backend == 'process':
+            if pool is None:
+                pool = WorkerPool(processes=workers, preload=())
+                owns_pool = True
+            num_cores = pool.processes
+            if engine != 'pool':
+                shared = SharedGrid(grid)
+                grid = shared.grid
+        else:
+            pool = None
+            if backend == 'thread':
+                threads = ThreadBackend(workers)
+                num_cores = threads.workers
+        tiled = shared is not None or threads is not None
+        if tiled:
+            tiles = make_tiles(rows, num_cores, align=stream_block_rows(cols) if stochastic else 1)
+            tile_migration = dict(migration, halo_rows=True)
+            periodic = boundary == 'periodic'
+        # Agents wander into empty cells, so every cell stays eligible
+        active = ActiveCells(grid, reach=None if population is not None else halo, periodic=boundary == 'periodic',
+                             threshold=extinction_threshold)
+        monitor = ConvergenceMonitor(cell_tol, global_tol, patience) if early_stop else None
+        if monitor is not None:
+            monitor.quiet_years = quiet_years
+        stop_reason = None
+        cancelled = False
+        timer = make_timer(instrument)
+        process = psutil.Process(os.getpid())
+
+        def timed_tile(tile):
+            started = time.perf_counter()
+            stats = step_rows(grid, next_grid, *tile, step, params, halo, periodic, stochastic)
+            return time.perf_counter() - started, stats, threading.get_ident()
+
+        for year_idx in range(first_year_idx, years):
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                print(f'[INFO] Simulation cancelled before {start_year + year_idx}')
+                break
+            year = start_year + year_idx
+            year_start_time = time.time()
+            compute_start = time.perf_counter()
+            timer.reset()
+            worker_stats = None
+            if tiled:
+                year_stats = {}
+                live_tiles = [tile for tile in tiles if active.rows_active(*tile)]
+                if stochastic:
+                    step, params = tau_leap_grid_step, (alpha, beta, gamma, delta, dt, seed, year_idx)
+                else:
+                    step, params = advance_grid, (alpha, beta, gamma, delta, integrator_options, tile_migration)
+                timer.lap('dispatch')
+                if shared is not None:
+                    tile_results = shared.advance(pool, live_tiles, step, params, halo=halo, periodic=periodic, with_rows=stochastic)
+                    grid = shared.grid
+                    next_grid = shared.buffers[1 - shared.current]
+                else:
+                    tile_results = threads.map(timed_tile, live_tiles)
+                    grid, next_grid = next_grid, grid
+                if timer.enabled:
+                    worker_stats = worker_usage(tile_results, timer.lap('compute'))
+                for _, stats, _ in tile_results:
+                    year_stats = merge_stats(year_stats, stats)
+            elif pool is not None:
+                year_stats = _advance_with_pool(pool, grid, next_grid, alpha, beta, gamma, delta, integrator_options, active)
+                grid, next_grid = next_grid, grid
+            elif population is not None:
+                year_stats = advance_agents(population, next_grid, alpha, beta, gamma, delta, dt, seed, year_idx)
+                grid, next_grid = next_grid, grid
+            elif stochastic:
+                year_stats = tau_leap_grid_step(grid, next_grid, alpha, beta, gamma, delta, dt, seed, year_idx, active=active)
+                grid, next_grid = next_grid, grid
+            else:
+                year_stats = _advance_active(grid, next_grid, active, alpha, beta, gamma, delta, integrator_options, migration)
+                grid, next_grid = next_grid, grid
+            timer.lap('compute')
+            active.update(grid, next_grid)
+            compute_time += time.perf_counter() - compute_start
+            integrator_stats = merge_stats(integrator_stats, year_stats)
+            total_rabbits = int(np.sum(grid[..., 0]))
+            total_wolves = int(np.sum(grid[..., 1]))
+            timer.lap('gather')
+            if history is not None:
+                history.record(year_idx, grid)
+            total_rabbits_by_year.append(total_rabbits)
+            total_wolves_by_year.append(total_wolves)
+            year_time = (time.time() - year_start_time) * 1000
+            memory_usage = process.memory_info().rss / 1024 / 1024
+            performance = {
                 "year": year,
                 "timePerYear": year_time,
                 "memoryUsage": memory_usage,
-                "cores": num_cores
-            })
-        yearly_results.append(year_data)
-        total_rabbits_by_year.append(total_rabbits)
-        total_wolves_by_year.append(total_wolves)
-    pool.close()
-    pool.join()
+                "integratorSteps": year_stats.get("steps"),
+                "activeCells": active.count
+            }
+            performance_data.append(performance)
+            timer.lap('record')
+            if timer.enabled:
+                performance["phases"] = timer.current_ms()
+                if worker_stats is not None:
+                    performance["workers"] = worker_stats
+            if socketio:
+                socketio.emit('year_update', {
+                    "year": year, 
+                    "rabbits": total_rabbits, 
+                    "wolves": total_wolves
+                })
+                socketio.emit('performance_update', {
+                    "year": year,
+                    "timePerYear": year_time,
+                    "memoryUsage": memory_usage,
+                    "cores": num_cores,
+                    **({"phases": performance["phases"]} if timer.enabled else {}),
+                    **({"workers": worker_stats} if worker_stats is not None else {})
+                })
+                timer.lap('emit')
+            if grid_stream is not None:
+                grid_stream.send(year_idx, year, grid)
+                timer.lap('emit')
+            if monitor is not None:
+                stop_reason = monitor.check(grid, next_grid, active.count)
+                timer.lap('monitor')
+                if stop_reason:
+                    break
+            stopping = cancel_event is not None and cancel_event.is_set()
+            if checkpoints is not None and year_idx < years - 1 and (stopping or checkpoints.due(year_idx)):
+                if history is not None:
+                    # A disk-backed history is already in place, only the in-memory one goes into the checkpoint
+                    history.flush()
+                checkpoints.write(year_idx, {
+                    "grid": grid,
+                    "total_rabbits_by_year": np.array(total_rabbits_by_year, dtype=np.int64),
+                    "total_wolves_by_year": np.array(total_wolves_by_year, dtype=np.int64),
+                    **({"history": history.data[:year_idx + 1]} if history is not None and not history.path else {}),
+                    **(population.state() if population is not None else {})
+                }, {
+                    "params": run_params,
+                    "year_idx": year_idx,
+                    "performance_data": performance_data,
+                    "integrator_stats": integrator_stats,
+                    "compute_time": compute_time,
+                    "quiet_years": monitor.quiet_years if monitor is not None else 0,
+                    "checkpoint_every_years": checkpoint_every_years,
+                    "checkpoint_every_seconds": checkpoint_every_seconds
+                })
+                performance["checkpointMs"] = checkpoints.seconds_last * 1000
+                timer.lap('checkpoint')
+            if timer.enabled:
+                # The stored entry also covers what happened after performance_update went out
+                performance["phases"] = timer.current_ms()
+        years_computed = len(total_rabbits_by_year)
+        if stop_reason:
+            # Extinct cells and a settled grid stay put, so the remaining years are copies
+            stop_year = start_year + years_computed - 1
+            print(f'[INFO] Simulation stopped early in {stop_year}: {stop_reason}')
+            if history is not None:
+                history.fill(years_computed, grid)
+            for year in range(stop_year + 1, end_year + 1):
+                total_rabbits_by_year.append(total_rabbits)
+                total_wolves_by_year.append(total_wolves)
+            if socketio:
+                socketio.emit('simulation_converged', {
+                    "year": stop_year,
+                    "endYear": end_year,
+                    "reason": stop_reason,
+                    "rabbits": total_rabbits,
+                    "wolves": total_wolves
+                })
+        if history is not None:
+            history.flush()
+        if shared is not None:
+            del grid
+            grid = shared.release()
+            shared = None
+    finally:
+        if shared is not None:
+            # The run failed part way; unlink the block rather than leave it in /dev/shm
+            shared.release()
+        if owns_pool:
+            pool.shutdown()
+        if threads is not None:
+            threads.shutdown()
+    if checkpoints is not None and not cancelled and os.path.exists(checkpoint_path):
+        # The run finished, so there is nothing left to resume
+        os.remove(checkpoint_path)
     execution_time = time.time() - start_time
     return {
         "rows": rows, 
@@ -133,10 +500,47 @@ def run_simulation(start_year, end_year, rabbits, wolves, alpha, beta, gamma, de
         "years": years, 
         "start_year": start_year, 
         "end_year": end_year, 
-        "yearly_results": yearly_results, 
+        "history": history,
         "total_rabbits_by_year": total_rabbits_by_year, 
         "total_wolves_by_year": total_wolves_by_year,
         "execution_time": execution_time,
+        "compute_time": compute_time,
+        "cells_per_second": rows * cols * (years_computed - 1) / compute_time if compute_time else None,
         "cores_used": num_cores,
+        "engine": engine,
+        "backend": backend,
+        "backend_reason": backend_reason,
+        "integrator": integrator,
+        "integrator_stats": integrator_stats,
+        "stochastic": stochastic,
+        "seed": seed,
+        "agents": population.count if population is not None else None,
+        "migration": migration,
+        "active_cells": active.count,
+        "params": run_params,
+        "checkpoint": checkpoints.summary() if checkpoints is not None else None,
+        "resumed_from": start_year + first_year_idx - 1 if resume is not None else None,
+        "termination": {
+            "reason": "cancelled" if cancelled else stop_reason or "completed",
+            "year": start_year + years_computed - 1,
+            "converged_early": stop_reason is not None,
+            "years_computed": years_computed
+        },
+        "phase_totals": timer.totals_ms(),
         "performance_data": performance_data
-    } 
\ No newline at end of file
+    } 
+
+def resume_simulation(checkpoint_path, socketio=None, pool=None, **overrides):
+    """Continue a run from its last checkpoint; the remaining years match an uninterrupted run bit for bit.
+
+    ``overrides`` may change settings that do not affect the numbers, such
+    as ``engine`` or the checkpoint cadence.
+    """
+    arrays, meta = load_checkpoint(checkpoint_path)
+    params = dict(meta['params'])
+    params.setdefault('checkpoint_every_years', meta.get('checkpoint_every_years'))
+    params.setdefault('checkpoint_every_seconds', meta.get('checkpoint_every_seconds'))
+    params.update(overrides)
+    return run_simulation(
+        socketio=socketio, pool=pool, checkpoint_path=checkpoint_path, resume=(arrays, meta), **params
+    )
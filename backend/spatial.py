@@ -0,0 +1,61 @@
+import numpy as np
+
+BOUNDARIES = ('reflecting', 'periodic')
+
+def _pad_mode(boundary):
+    return 'wrap' if boundary == 'periodic' else 'edge'
+
+def laplacian(field, boundary='reflecting', halo_rows=False):
+    """Five-point discrete Laplacian over the first two axes of ``field``.
+
+    Reflecting boundaries mirror the edge cell (zero flux, so migration
+    conserves population); periodic boundaries wrap around. ``halo_rows``
+    marks a row tile whose top and bottom rows are halo copied from
+    neighbouring tiles: those edges are padded by repetition and the caller
+    discards the rows they contaminate.
+    """
+    row_mode = 'edge' if halo_rows else _pad_mode(boundary)
+    col_mode = _pad_mode(boundary)
+    extra = [(0, 0)] * (field.ndim - 2)
+    padded = np.pad(field, [(1, 1), (0, 0)] + extra, mode=row_mode)
+    padded = np.pad(padded, [(0, 0), (1, 1)] + extra, mode=col_mode)
+    result = padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+    result -= 4 * field
+    return result
+
+def with_migration(rhs, migration):
+    """Wrap a per-cell ``rhs`` so dispersal between neighbouring cells is added to it.
+
+    ``migration`` holds ``rabbit_rate`` and ``wolf_rate`` (fraction of the
+    population exchanged with each neighbour per year), ``boundary`` and
+    ``halo_rows``. The wrapped function needs the whole (rows, cols, 2) state,
+    so it cannot be stepped cell by cell.
+    """
+    rates = np.array([migration['rabbit_rate'], migration['wolf_rate']], dtype=float)
+    boundary = migration.get('boundary', 'reflecting')
+    halo_rows = migration.get('halo_rows', False)
+
+    def coupled(state, index=None):
+        if index is not None:
+            raise ValueError("Migration couples neighbouring cells; the state cannot be stepped per cell")
+        deriv = rhs(state)
+        deriv += rates * laplacian(state, boundary, halo_rows)
+        return deriv
+
+    return coupled
+
+def stencil_applications(method, dt):
+    """Stencil evaluations per simulated year, i.e. the halo width a row tile needs.
+
+    Returns ``None`` for adaptive integrators, whose step count is not known
+    in advance.
+    """
+    steps = max(1, int(round(1.0 / dt)))
+    if method == 'euler':
+        return steps
+    if method == 'rk4':
+        return 4 * steps
+    return None
+
+def migration_enabled(migration):
+    return bool(migration) and (migration.get('rabbit_rate', 0) > 0 or migration.get('wolf_rate', 0) > 0)
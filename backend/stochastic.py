@@ -0,0 +1,61 @@
+import numpy as np
+
+# Cells per random stream; a block is a whole number of rows
+STREAM_BLOCK_CELLS = 16384
+
+def stream_block_rows(cols):
+    """Rows per random stream block for a grid ``cols`` wide (fixed by the grid, not the core count)."""
+    return max(1, STREAM_BLOCK_CELLS // cols)
+
+def block_generator(seed, year_idx, block):
+    """The independent stream of one (year, row block) pair, spawned from the run's ``seed``."""
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(year_idx, block))))
+
+def new_seed():
+    return int(np.random.SeedSequence().entropy)
+
+def tau_leap_block(state, rng, alpha, beta, gamma, delta, dt, steps):
+    """Advance integer (..., 2) populations by ``steps`` tau-leaps of length ``dt``.
+
+    Per leap rabbits are born ~ Poisson(alpha R dt) and eaten ~ Binomial(R,
+    1 - exp(-beta W dt)); wolves are born ~ Poisson(delta R W dt) and die ~
+    Binomial(W, 1 - exp(-gamma dt)). Deaths are binomial so no count can go
+    negative, and an empty cell stays empty.
+    """
+    rabbits = state[..., 0].astype(np.int64)
+    wolves = state[..., 1].astype(np.int64)
+    wolf_death_p = -np.expm1(-gamma * dt)
+    for _ in range(steps):
+        births = rng.poisson(alpha * dt * rabbits)
+        eaten = rng.binomial(rabbits, -np.expm1(-beta * dt * wolves))
+        wolf_births = rng.poisson((delta * dt) * rabbits * wolves)
+        wolf_deaths = rng.binomial(wolves, wolf_death_p)
+        rabbits += births - eaten
+        wolves += wolf_births - wolf_deaths
+    return rabbits, wolves
+
+def tau_leap_grid_step(grid, out, alpha, beta, gamma, delta, dt, seed, year_idx, row_start=0, active=None):
+    """Advance rows of a (rows, cols, 2) grid by one stochastic year, writing into ``out``.
+
+    ``grid`` may be a tile starting at absolute row ``row_start``; it must
+    cover whole stream blocks (see ``make_tiles(..., align=)``). Each block
+    draws from its own ``block_generator`` stream, so the result is the same
+    however the grid is split across workers. Blocks without live cells in
+    ``active`` are skipped; they are already zero in ``out``.
+    """
+    rows, cols = grid.shape[:2]
+    block_rows = stream_block_rows(cols)
+    # Whole leaps of equal length cover exactly one year whatever dt is
+    steps = max(1, int(round(1.0 / dt)))
+    stepped = 0
+    for low in range(0, rows, block_rows):
+        high = min(rows, low + block_rows)
+        if active is not None and not active.rows_active(row_start + low, row_start + high):
+            continue
+        rng = block_generator(seed, year_idx, (row_start + low) // block_rows)
+        rabbits, wolves = tau_leap_block(grid[low:high], rng, alpha, beta, gamma, delta, 1.0 / steps, steps)
+        out[low:high, :, 0] = rabbits
+        out[low:high, :, 1] = wolves
+        stepped += (high - low) * cols
+    return {"method": "tau_leap", "steps": steps * stepped, "rejected_steps": 0,
+            "function_evaluations": steps * stepped, "max_cell_steps": steps if stepped else 0}
@@ -0,0 +1,139 @@
+import os
+import time
+import math
+import itertools
+import numpy as np
+from .integrators import INTEGRATORS, integrate, lotka_volterra_rhs
+from .utils import legacy_grid_side
+
+SWEEP_KEYS = ('rabbits', 'wolves', 'alpha', 'beta', 'gamma', 'delta')
+# Below this many parameter sets the chunks are simulated in process
+MIN_POOL_SETS = 64
+# Largest sweep accepted from one request
+MAX_SWEEP_SETS = int(os.environ.get('SIM_MAX_SWEEP_SETS', 10000))
+
+def build_parameter_sets(base=None, grid=None, sets=None, max_sets=MAX_SWEEP_SETS):
+    """Expand a sweep request into a list of complete parameter dicts.
+
+    ``grid`` maps parameter names to lists of values and is expanded as a
+    cartesian product; ``sets`` is an explicit list of dicts. Missing values
+    in either are taken from ``base``. More than ``max_sets`` sets in total
+    are refused before anything is expanded.
+    """
+    base = dict(base or {})
+    count = (math.prod(len(values) for values in grid.values()) if grid else 0) + len(sets or [])
+    if count > max_sets:
+        raise ValueError(f"The sweep has {count} parameter sets, more than the limit of {max_sets}")
+    expanded = []
+    if grid:
+        names = list(grid)
+        for values in itertools.product(*(grid[name] for name in names)):
+            expanded.append(dict(base, **dict(zip(names, values))))
+    for entry in sets or []:
+        expanded.append(dict(base, **entry))
+    if not expanded and base:
+        expanded.append(base)
+    if not expanded:
+        raise ValueError("A sweep needs a parameter grid, a list of parameter sets or base parameters")
+    for index, params in enumerate(expanded):
+        missing = [key for key in SWEEP_KEYS if key not in params]
+        if missing:
+            raise ValueError(f"Parameter set {index} is missing: {', '.join(missing)}")
+    return expanded
+
+def _cell_classes(rabbits, wolves):
+    """Collapse each set's initial grid into at most three classes of identical cells.
+
+    ``run_simulation`` spreads the population evenly and hands the remainder
+    out one animal per cell in row-major order, so without migration a grid
+    only ever contains cells with +1 rabbit and wolf, cells with +1 of one
+    species, and base cells. Returns states (sets, 3, 2) and weights
+    (sets, 3) counting how many cells of each class the grid holds.
+    """
+    total = rabbits + wolves
+    sides = np.array([legacy_grid_side(int(t)) for t in total], dtype=np.int64)
+    cells = sides * sides
+    base_rabbits, rabbits_left = np.divmod(rabbits, cells)
+    base_wolves, wolves_left = np.divmod(wolves, cells)
+    both = np.minimum(rabbits_left, wolves_left)
+    one = np.maximum(rabbits_left, wolves_left)
+    weights = np.stack([both, one - both, cells - one], axis=1).astype(float)
+    states = np.empty((len(total), 3, 2))
+    states[:, :, 0] = base_rabbits[:, None] + [1, 0, 0]
+    states[:, :, 1] = base_wolves[:, None] + [1, 0, 0]
+    states[:, 1, 0] += rabbits_left > wolves_left
+    states[:, 1, 1] += wolves_left > rabbits_left
+    return states, weights, sides
+
+def simulate_chunk(task):
+    """Advance a block of stacked parameter sets through every year; returns per-set totals."""
+    matrix, years, integrator = task
+    rabbits = matrix[:, 0].astype(np.int64)
+    wolves = matrix[:, 1].astype(np.int64)
+    state, weights, _ = _cell_classes(rabbits, wolves)
+    rates = [np.broadcast_to(matrix[:, k, None], weights.shape) for k in range(2, 6)]
+    rhs = lotka_volterra_rhs(*rates)
+    totals = np.empty((len(matrix), years, 2), dtype=np.int64)
+    totals[:, 0] = np.einsum('sk,skj->sj', weights, state).astype(np.int64)
+    for year_idx in range(1, years):
+        state, _ = integrate(
+            state, rhs, method=integrator['method'], dt=integrator['dt'],
+            rtol=integrator['rtol'], atol=integrator['atol']
+        )
+        totals[:, year_idx] = np.einsum('sk,skj->sj', weights, state).astype(np.int64)
+    return totals
+
+def run_sweep(parameter_sets, start_year, end_year, pool=None, chunk_size=None,
+              integrator='euler', dt=0.1, rtol=1e-6, atol=1e-6, cancel_event=None):
+    """Simulate many parameter sets at once and return compact per-set time series.
+
+    All sets are stacked along an extra array dimension and advanced together
+    with the vectorized integrators; large sweeps are split into chunks that
+    run on the shared worker pool. Totals follow ``run_simulation`` on the
+    default legacy grid without migration, up to float summation order.
+    With a ``cancel_event`` the chunks run one round per worker and the
+    sweep returns None once the event is set.
+    """
+    start_time = time.time()
+    if end_year < start_year:
+        raise ValueError("end_year must not be before start_year")
+    if integrator not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator '{integrator}', expected one of: {', '.join(INTEGRATORS)}")
+    matrix = np.array([[float(params[key]) for key in SWEEP_KEYS] for params in parameter_sets])
+    if (matrix[:, 2:] <= 0).any():
+        raise ValueError("All rate parameters (alpha, beta, gamma, delta) must be positive")
+    if (matrix[:, :2] < 0).any():
+        raise ValueError("Initial populations must not be negative")
+    years = end_year - start_year + 1
+    options = {"method": integrator, "dt": dt, "rtol": rtol, "atol": atol}
+    workers = pool.processes if pool is not None and len(matrix) >= MIN_POOL_SETS else 1
+    chunk_size = chunk_size or max(1, -(-len(matrix) // (workers * 4)))
+    tasks = [(matrix[i:i + chunk_size], years, options) for i in range(0, len(matrix), chunk_size)]
+    batch = workers if cancel_event is not None else len(tasks)
+    chunks = []
+    for i in range(0, len(tasks), batch):
+        if cancel_event is not None and cancel_event.is_set():
+            print(f'[INFO] Sweep cancelled after {sum(len(chunk) for chunk in chunks)} of {len(matrix)} parameter sets')
+            return None
+        if workers > 1:
+            chunks.extend(pool.map(simulate_chunk, tasks[i:i + batch]))
+        else:
+            chunks.extend(simulate_chunk(task) for task in tasks[i:i + batch])
+    totals = np.concatenate(chunks)
+    sides = [legacy_grid_side(int(r + w)) for r, w in matrix[:, :2]]
+    execution_time = time.time() - start_time
+    print(f'[INFO] Sweep of {len(matrix)} parameter sets over {years} years finished in {execution_time:.2f}s')
+    return {
+        "start_year": start_year,
+        "end_year": end_year,
+        "years": years,
+        "sets": len(matrix),
+        "parameters": [{key: params[key] for key in SWEEP_KEYS} for params in parameter_sets],
+        "grid_sizes": [[side, side] for side in sides],
+        "total_rabbits_by_year": totals[:, :, 0].tolist(),
+        "total_wolves_by_year": totals[:, :, 1].tolist(),
+        "integrator": integrator,
+        "chunks": len(tasks),
+        "cores_used": workers,
+        "execution_time": execution_time
+    }
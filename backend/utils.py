@@ -1,5 +1,8 @@
 import os
+import math
+import shutil
 import requests
+import psutil
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -32,16 +35,74 @@ def create_fallback_logo(logo_path):
     except Exception as e:
         print(f"[ERROR] Failed to create fallback logo: {str(e)}")
 
-def determine_grid_size(total_population):
-    if total_population <= 50:
-        print(f'[INFO] Grid size determined: 2x2 for population {total_population}')
-        return 2, 2
-    elif total_population <= 200:
-        print(f'[INFO] Grid size determined: 5x5 for population {total_population}')
-        return 5, 5
-    elif total_population <= 1000:
-        print(f'[INFO] Grid size determined: 10x10 for population {total_population}')
-        return 10, 10
-    else:
-        print(f'[INFO] Grid size determined: 20x20 for population {total_population}')
-        return 20, 20 
\ No newline at end of file
+# Population limits of the legacy grid sizes; anything larger gets 20x20
+LEGACY_GRID_BUCKETS = ((50, 2), (200, 5), (1000, 10))
+# Per-cell history is kept by default while it stays below this size
+HISTORY_AUTO_BYTES = 512 * 1024 * 1024
+# Rough bytes per cell for the engine's working arrays (state double buffer plus scratch/stage arrays)
+ENGINE_BYTES_PER_CELL = {'euler': 80, 'rk4': 160, 'dopri5': 288}
+
+def determine_grid_size(total_population, rows=None, cols=None, density=None):
+    """Pick the simulation grid.
+
+    Explicit ``rows``/``cols`` win (a single value gives a square grid);
+    otherwise ``density`` (animals per cell) sizes a square grid to the
+    population; otherwise the legacy population buckets up to 20x20 apply.
+    """
+    if rows is not None or cols is not None:
+        rows = int(rows if rows is not None else cols)
+        cols = int(cols if cols is not None else rows)
+        if rows <= 0 or cols <= 0:
+            raise ValueError("Grid rows and cols must be positive")
+        print(f'[INFO] Grid size requested: {rows}x{cols}')
+        return rows, cols
+    if density is not None:
+        if density <= 0:
+            raise ValueError("Grid density must be positive")
+        side = max(1, math.ceil(math.sqrt(total_population / density)))
+        print(f'[INFO] Grid size determined: {side}x{side} for population {total_population} at density {density}')
+        return side, side
+    side = legacy_grid_side(total_population)
+    print(f'[INFO] Grid size determined: {side}x{side} for population {total_population}')
+    return side, side
+
+def legacy_grid_side(total_population):
+    """Side of the square grid the original population buckets give (2, 5, 10 or 20)."""
+    for limit, side in LEGACY_GRID_BUCKETS:
+        if total_population <= limit:
+            return side
+    return 20
+
+def estimate_memory(rows, cols, years, integrator='euler', history_bytes=0):
+    """Estimated peak bytes a run needs beyond the interpreter baseline."""
+    cells = rows * cols
+    return cells * ENGINE_BYTES_PER_CELL.get(integrator, ENGINE_BYTES_PER_CELL['dopri5']) + history_bytes
+
+def check_memory_budget(estimate, budget_mb=None):
+    """Raise ValueError if ``estimate`` bytes exceed the budget.
+
+    The budget is ``budget_mb``, else ``SIM_MEMORY_BUDGET_MB``, else half of
+    the memory currently available.
+    """
+    if budget_mb is None:
+        budget_mb = float(os.environ.get('SIM_MEMORY_BUDGET_MB', 0)) or None
+    budget = budget_mb * 1024 * 1024 if budget_mb else psutil.virtual_memory().available * 0.5
+    if estimate > budget:
+        raise ValueError(
+            f"Simulation needs about {estimate / 1024 / 1024:.0f} MB, over the "
+            f"{budget / 1024 / 1024:.0f} MB memory budget; use a smaller grid, fewer years or no cell history"
+        )
+    return budget
+
+def check_disk_space(path, needed):
+    """Raise ValueError if the filesystem that will hold ``path`` has less than ``needed`` bytes free."""
+    folder = os.path.dirname(os.path.abspath(path))
+    while not os.path.isdir(folder):
+        folder = os.path.dirname(folder)
+    free = shutil.disk_usage(folder).free
+    if needed > free:
+        raise ValueError(
+            f"Cell history needs about {needed / 1024 / 1024:.0f} MB on disk but only "
+            f"{free / 1024 / 1024:.0f} MB are free; use a smaller grid, fewer years or no cell history"
+        )
+    return free
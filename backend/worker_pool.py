@@ -0,0 +1,137 @@
+import os
+import time
+import atexit
+import importlib
+import threading
+import multiprocessing
+
+DEFAULT_PRELOAD = ('numpy', 'backend.simulation')
+
+def _preload_modules(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f'[WARNING] Worker {os.getpid()} could not preload {name}: {str(e)}')
+
+def _ping(_=None):
+    return os.getpid()
+
+class WorkerPool:
+    """Long-lived process pool shared by every simulation run of the backend.
+
+    The pool is started once (lazily on first use, or eagerly via ``start``),
+    workers import the ``preload`` modules up front so runs never pay that
+    cost, and each worker is replaced after ``max_tasks_per_child`` tasks.
+    Work should go through ``map``, which counts the tasks in flight so a
+    busy pool is never restarted from under them.
+    """
+
+    def __init__(self, processes=None, max_tasks_per_child=None, preload=DEFAULT_PRELOAD):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.max_tasks_per_child = max_tasks_per_child
+        self.preload = tuple(preload)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._restarts = 0
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls):
+        processes = int(os.environ.get('SIM_POOL_SIZE', 0)) or None
+        max_tasks = int(os.environ.get('SIM_POOL_MAX_TASKS', 0)) or None
+        preload = os.environ.get('SIM_POOL_PRELOAD')
+        preload = [m.strip() for m in preload.split(',') if m.strip()] if preload is not None else DEFAULT_PRELOAD
+        return cls(processes=processes, max_tasks_per_child=max_tasks, preload=preload)
+
+    def start(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._create()
+            return self._pool
+
+    def _create(self):
+        print(f'[INFO] Starting worker pool: {self.processes} processes, '
+              f'max_tasks_per_child={self.max_tasks_per_child}, preload={list(self.preload)}')
+        pool = multiprocessing.Pool(
+            processes=self.processes,
+            initializer=_preload_modules,
+            initargs=(self.preload,),
+            maxtasksperchild=self.max_tasks_per_child
+        )
+        self._started_at = time.time()
+        return pool
+
+    def get(self):
+        """Return the underlying ``multiprocessing.Pool``, starting it if needed."""
+        return self._pool or self.start()
+
+    def map(self, func, iterable, chunksize=None):
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self.get().map(func, iterable, chunksize)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    @property
+    def running(self):
+        return self._pool is not None
+
+    def health_check(self, timeout=5.0):
+        """Check that every worker process is alive and, while the pool is idle, that it answers a trivial task.
+
+        A busy pool is judged by worker liveness alone, since a ping would
+        only queue behind the running tasks. An idle pool that does not
+        answer within ``timeout`` is restarted.
+        """
+        started = time.time()
+        pool = self.get()
+        alive = sum(worker.is_alive() for worker in getattr(pool, '_pool', []))
+        in_flight = self._in_flight
+        healthy = alive == self.processes
+        if healthy and not in_flight:
+            try:
+                pool.map_async(_ping, range(self.processes), 1).get(timeout)
+            except Exception as e:
+                print(f'[WARNING] Worker pool health check failed: {str(e)}')
+                healthy = False
+                self.restart()
+        return {
+            "healthy": healthy,
+            "processes": self.processes,
+            "aliveWorkers": alive,
+            "inFlight": in_flight,
+            "latencyMs": (time.time() - started) * 1000,
+            "uptime": time.time() - self._started_at if self._started_at else 0,
+            "restarts": self._restarts,
+            "maxTasksPerChild": self.max_tasks_per_child
+        }
+
+    def restart(self):
+        """Replace the pool's processes; refused (returns False) while tasks are in flight."""
+        with self._lock:
+            if self._in_flight:
+                print(f'[WARNING] Not restarting the worker pool: {self._in_flight} tasks in flight')
+                return False
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+            self._pool = self._create()
+            self._restarts += 1
+            return True
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is None:
+                return
+            print('[INFO] Shutting down worker pool')
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def register_shutdown(self):
+        atexit.register(self.shutdown)
+        return self
@@ -801,14 +801,18 @@ socket.emit("start_simulation", params);`}
                                   </Badge>
                                 </div>
                                 <pre className="p-4 font-mono text-sm overflow-x-auto">
-                                  {`// Listen for year updates
-socket.on("year_update", (data) => {
-  console.log(\`Year: \${data.year}, Rabbits: \${data.rabbits}, Wolves: \${data.wolves}\`);
-});
-
-// Listen for performance updates
-socket.on("performance_update", (data) => {
-  console.log(\`Cores: \${data.cores}, Time per year: \${data.timePerYear}s\`);
+                                  {`// Listen for progress frames (several years per event, JSON encoding)
+socket.on("progress_frame", (frame) => {
+  const totals = frame.year_update;
+  if (totals) {
+    totals.year.forEach((year, i) => {
+      console.log(\`Year: \${year}, Rabbits: \${totals.rabbits[i]}, Wolves: \${totals.wolves[i]}\`);
+    });
+  }
+  const performance = frame.performance_update;
+  if (performance) {
+    console.log(\`Cores: \${performance.cores.at(-1)}, Time per year: \${performance.timePerYear.at(-1)}s\`);
+  }
 });
 
 // Listen for PDF generation
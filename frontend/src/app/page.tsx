@@ -71,6 +71,16 @@ const algorithmInfo = [
   },
 ]
 
+// Columns of a progress_frame group: JSON lists, or little-endian float64 buffers with the binary encoding
+const decodeFrameGroup = (group: any) => {
+  if (!group) return null
+  const columns: Record<string, any> = {}
+  for (const [key, value] of Object.entries(group)) {
+    columns[key] = value instanceof ArrayBuffer ? Array.from(new Float64Array(value)) : value
+  }
+  return columns
+}
+
 export default function Home() {
   // State
   const [socket, setSocket] = useState<Socket | null>(null)
@@ -157,33 +167,51 @@ export default function Home() {
         variant: "destructive",
       })
     })
-    newSocket.on("year_update", (data) => {
-      setCurrentYear(data.year)
-      setPopulationData((prev) => [
-        ...prev,
-        {
-          year: data.year,
+    newSocket.on("progress_frame", (frame) => {
+      const population = decodeFrameGroup(frame.year_update)
+      if (population) {
+        const rows = population.year.map((year: number, i: number) => ({
+          year,
+          rabbits: population.rabbits[i],
+          wolves: population.wolves[i],
+          ratio: population.rabbits[i] > 0 ? (population.wolves[i] / population.rabbits[i]).toFixed(2) : 0,
+        }))
+        setPopulationData((prev) => [...prev, ...rows])
+      }
+      const performance = decodeFrameGroup(frame.performance_update)
+      if (performance) {
+        setCoresUsed(performance.cores[performance.cores.length - 1])
+        const rows = performance.year.map((year: number, i: number) => ({
+          year,
+          timePerYear: performance.timePerYear[i],
+          memoryUsage: performance.memoryUsage[i],
+        }))
+        setPerformanceData((prev) => [...prev, ...rows])
+      }
+      if (frame.year !== undefined) {
+        setCurrentYear(frame.year)
+        const totalYears = endYear - startYear
+        setProgress(((frame.year - startYear) / totalYears) * 100)
+      }
+    })
+    newSocket.on("simulation_converged", (data) => {
+      const remaining = []
+      for (let year = data.year + 1; year <= data.endYear; year++) {
+        remaining.push({
+          year,
           rabbits: data.rabbits,
           wolves: data.wolves,
           ratio: data.rabbits > 0 ? (data.wolves / data.rabbits).toFixed(2) : 0,
-     
-        },
-      ])
-      const totalYears = endYear - startYear
-      const currentProgress = data.year - startYear
-      const progressPercentage = (currentProgress / totalYears) * 100
-      setProgress(progressPercentage)
-    })
-    newSocket.on("performance_update", (data) => {
-      setCoresUsed(data.cores)
-      setPerformanceData((prev) => [
-        ...prev,
-        {
-          year: data.year,
-          timePerYear: data.timePerYear,
-          memoryUsage: data.memoryUsage,
-        },
-      ])
+        })
+      }
+      setPopulationData((prev) => [...prev, ...remaining])
+      setCurrentYear(data.endYear)
+      setProgress(100)
+      toast({
+        title: "Simulation Converged",
+        description: `Stopped computing in ${data.year} (${data.reason === "extinction" ? "both species extinct" : "steady state reached"})`,
+        variant: "default",
+      })
     })
     newSocket.on("pdf_updated", (data) => {
       setPdfUrl(data.pdfUrl)
@@ -0,0 +1,55 @@
+// Decoder for the backend's `grid_frame` events (see "Grid frames" in the README)
+
+export type GridFrame = {
+  year: number
+  kind: "key" | "delta"
+  rows: number
+  cols: number
+  count: number
+  dtype: "float32" | "uint16"
+  scales: [number, number]
+  compressed: boolean
+  data: ArrayBuffer
+}
+
+export type GridState = {
+  year: number
+  rows: number
+  cols: number
+  rabbits: Float32Array
+  wolves: Float32Array
+}
+
+async function inflate(data: ArrayBuffer): Promise<ArrayBuffer> {
+  const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream("deflate"))
+  return new Response(stream).arrayBuffer()
+}
+
+// Applies one frame to the previous state; keyframes replace it, delta frames patch the listed cells
+export async function decodeGridFrame(frame: GridFrame, previous: GridState | null): Promise<GridState> {
+  const buffer = frame.compressed ? await inflate(frame.data) : frame.data
+  const { rows, cols, count } = frame
+  const isDelta = frame.kind === "delta"
+  if (isDelta && (!previous || previous.rows !== rows || previous.cols !== cols)) {
+    throw new Error("Delta grid frame received before a keyframe")
+  }
+  const view = new DataView(buffer)
+  const valueBytes = frame.dtype === "float32" ? 4 : 2
+  const planeOffset = isDelta ? 4 * count : 0
+  // Deltas patch copies of the previous planes, so earlier states stay untouched
+  const state: GridState = isDelta
+    ? { year: frame.year, rows, cols, rabbits: previous!.rabbits.slice(), wolves: previous!.wolves.slice() }
+    : { year: frame.year, rows, cols, rabbits: new Float32Array(rows * cols), wolves: new Float32Array(rows * cols) }
+  const planes = [state.rabbits, state.wolves]
+  for (let species = 0; species < 2; species++) {
+    const start = planeOffset + species * count * valueBytes
+    const scale = frame.scales[species]
+    for (let i = 0; i < count; i++) {
+      const at = start + i * valueBytes
+      const value = frame.dtype === "float32" ? view.getFloat32(at, true) : view.getUint16(at, true) * scale
+      const cell = isDelta ? view.getUint32(4 * i, true) : i
+      planes[species][cell] = value
+    }
+  }
+  return state
+}